@@ -0,0 +1,173 @@
+# ai/analytics.py
+# In-memory columnar copy of the order table, for computing recommendations with NumPy kernels.
+import threading
+
+import numpy as np
+from sqlalchemy import func
+
+from models import db, Product, Order
+
+
+class LoadedOrders:
+    """Remembers which orders an incremental loader has already folded in.
+
+    Ids are handed out at insert but only become visible at commit, so on
+    PostgreSQL an order can show up below the highest id already loaded.
+    Each refresh therefore re-reads the last `window` ids (from `floor()`)
+    and skips the ones seen before.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.last_order_id = 0
+        self._seen = set()  # Loaded ids above floor()
+
+    def floor(self):
+        """Orders with a larger id must be read on the next refresh."""
+        return max(self.last_order_id - self.window, 0)
+
+    def add(self, order_id):
+        """Marks an order as loaded; False if it already was."""
+        if order_id in self._seen:
+            return False
+        self._seen.add(order_id)
+        self.last_order_id = max(self.last_order_id, order_id)
+        if len(self._seen) > 2 * self.window:
+            self.prune()  # Keeps a large first load from holding every id
+        return True
+
+    def prune(self):
+        """Forgets ids that have fallen out of the window."""
+        floor = self.floor()
+        self._seen = {order_id for order_id in self._seen if order_id > floor}
+
+
+class SalesColumns:
+    """Order columns (product id, units, revenue, month) held as growable NumPy arrays.
+
+    Orders are only ever inserted, so `refresh()` just appends the rows it
+    hasn't loaded yet (see LoadedOrders).
+    """
+
+    COLUMNS = (("product_id", np.int64), ("quantity", np.int64), ("revenue", np.float64), ("month", np.int64))
+
+    def __init__(self, batch_size=10000):
+        self.batch_size = batch_size
+        self.size = 0
+        self.loaded = LoadedOrders()
+        self._arrays = {name: np.empty(0, dtype=dtype) for name, dtype in self.COLUMNS}
+
+    def view(self):
+        """Returns the loaded rows of each column (views, not copies)."""
+        return {name: array[:self.size] for name, array in self._arrays.items()}
+
+    def _append(self, rows):
+        needed = self.size + len(rows)
+        capacity = len(self._arrays["product_id"])
+        if needed > capacity:
+            # Grow geometrically so appends stay amortized O(1) per row
+            capacity = max(needed, capacity * 2, 1024)
+            for name, array in self._arrays.items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:self.size] = array[:self.size]
+                self._arrays[name] = grown
+
+        columns = np.array(rows, dtype=np.float64).T
+        for (name, dtype), values in zip(self.COLUMNS, columns):
+            self._arrays[name][self.size:needed] = values.astype(dtype)
+        self.size = needed
+
+    def refresh(self):
+        """Loads orders added since the last refresh."""
+        query = (
+            db.session.query(
+                Order.id, Order.product_id, Order.quantity, Order.total_price,
+                func.coalesce(func.extract("month", Order.timestamp), 0)
+            )
+            .filter(Order.id > self.loaded.floor())
+            .order_by(Order.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        batch = []
+        for order_id, *values in query:
+            if not self.loaded.add(order_id):
+                continue
+            batch.append(values)
+            if len(batch) == self.batch_size:
+                self._append(batch)
+                batch = []
+        if batch:
+            self._append(batch)
+        self.loaded.prune()
+
+
+def top_k(values, k):
+    """Indexes of the k largest non-zero values, largest first."""
+    candidates = np.flatnonzero(values)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-values[candidates], k - 1)[:k]]
+    return candidates[np.argsort(-values[candidates], kind="stable")]
+
+
+class SalesAnalytics:
+    """Computes the order-based recommendation sections from one SalesColumns copy."""
+
+    def __init__(self):
+        self.columns = SalesColumns()
+        self._lock = threading.Lock()
+
+    def recommendations(self, top_limit=5):
+        """Returns top sellers, category trends, monthly seasonality and revenue in one pass."""
+        with self._lock:
+            self.columns.refresh()
+            columns = self.columns.view()
+            product_ids, quantity, revenue, month = (
+                columns["product_id"], columns["quantity"], columns["revenue"], columns["month"]
+            )
+
+            # Product metadata, indexed by product id
+            products = db.session.query(Product.id, Product.name, Product.category).all()
+            size = max([product_id for product_id, _, _ in products] + [int(product_ids.max(initial=0))]) + 1
+            names = np.full(size, None, dtype=object)
+            exists = np.zeros(size, dtype=bool)
+            categories = sorted({category for _, _, category in products})
+            category_codes = np.full(size, -1, dtype=np.int64)
+            category_index = {category: code for code, category in enumerate(categories)}
+            for product_id, name, category in products:
+                names[product_id] = name
+                exists[product_id] = True
+                category_codes[product_id] = category_index[category]
+
+            # Ignore orders whose product has been deleted
+            known = exists[product_ids]
+            product_ids, quantity, revenue, month = product_ids[known], quantity[known], revenue[known], month[known]
+
+            units_by_product = np.bincount(product_ids, weights=quantity, minlength=size)
+            units_by_category = np.bincount(category_codes[product_ids], weights=quantity, minlength=len(categories))
+            units_by_month = np.bincount(month * size + product_ids, weights=quantity, minlength=13 * size).reshape(13, size)
+
+        top_sellers = [
+            {"name": names[product_id], "total_sold": int(units_by_product[product_id])}
+            for product_id in top_k(units_by_product, top_limit)
+        ]
+
+        category_trends = [
+            {"category": categories[code], "total_sold": int(units_by_category[code])}
+            for code in top_k(units_by_category, len(categories))
+        ] or [{"category": "No data", "total_sold": 0}]
+
+        time_based = [
+            {"name": names[product_id], "total_sold": int(units_by_month[month_number, product_id]), "month": month_number}
+            for month_number in range(1, 13)
+            for product_id in top_k(units_by_month[month_number], size)
+        ] or [{"name": "No data", "total_sold": 0, "month": "Unknown"}]
+
+        return {
+            "top_sellers": top_sellers,
+            "category_trends": category_trends,
+            "time_based_recommendations": time_based,
+            "total_revenue": float(revenue.sum())
+        }
+
+
+engine = SalesAnalytics()
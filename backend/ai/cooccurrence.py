@@ -0,0 +1,120 @@
+# ai/cooccurrence.py
+# Frequently-bought-together engine: basket co-occurrence counts, updated as sales arrive.
+from collections import Counter
+from itertools import permutations
+
+from sqlalchemy import func, insert, select, desc
+from sqlalchemy.orm import aliased
+
+from models import db, Product, Order, ProductPair, ProductSalesSummary, DailySalesSummary
+from upserts import increment_rows
+
+
+def record_baskets(baskets):
+    """Adds the product pairs of each basket (an iterable of product id sets) to ProductPair.
+
+    Runs in the caller's transaction, alongside the order inserts.
+    """
+    counts = Counter()
+    for product_ids in baskets:
+        counts.update(permutations(sorted(product_ids), 2))
+    if not counts:
+        return
+
+    increment_rows(ProductPair.__table__, ["product_id", "other_product_id"], [
+        {"product_id": a, "other_product_id": b, "basket_count": count} for (a, b), count in counts.items()
+    ])
+
+
+def rebuild_pairs():
+    """Recomputes ProductPair from the full order history (caller commits)."""
+    db.session.query(ProductPair).delete()
+
+    Order2 = aliased(Order)
+    db.session.execute(insert(ProductPair).from_select(
+        ["product_id", "other_product_id", "basket_count"],
+        select(Order.product_id, Order2.product_id, func.count(func.distinct(Order.basket_id)))
+        .join(Order2, Order.basket_id == Order2.basket_id)  # Pair lines from the same basket
+        .where(Order.basket_id.isnot(None), Order.product_id != Order2.product_id)
+        .group_by(Order.product_id, Order2.product_id)
+    ))
+
+
+def pair_query(min_support=0.0, min_lift=1.0):
+    """Builds a query of (product, other product, basket count, support, lift) rows.
+
+    support = share of all baskets containing both products
+    lift    = how much more often they appear together than if bought independently
+    """
+    total_baskets = db.session.query(func.sum(DailySalesSummary.basket_count)).scalar() or 0
+    if not total_baskets:
+        return None
+
+    Summary2 = aliased(ProductSalesSummary)
+    Product2 = aliased(Product)
+    support = (ProductPair.basket_count * 1.0 / total_baskets).label("support")
+    lift = (
+        ProductPair.basket_count * 1.0 * total_baskets
+        / (ProductSalesSummary.basket_count * Summary2.basket_count)
+    ).label("lift")
+
+    return (
+        db.session.query(
+            ProductPair.product_id, Product.name,
+            ProductPair.other_product_id, Product2.name,
+            ProductPair.basket_count, support, lift
+        )
+        .join(ProductSalesSummary, ProductSalesSummary.product_id == ProductPair.product_id)
+        .join(Summary2, Summary2.product_id == ProductPair.other_product_id)
+        .join(Product, Product.id == ProductPair.product_id)
+        .join(Product2, Product2.id == ProductPair.other_product_id)
+        .filter(support >= min_support, lift >= min_lift)
+    )
+
+
+def top_pairs(limit=10, min_support=0.0, min_lift=1.0):
+    """Most frequent product pairs over all baskets, each pair listed once."""
+    query = pair_query(min_support, min_lift)
+    if query is None:
+        return []
+
+    rows = (
+        query.filter(ProductPair.product_id < ProductPair.other_product_id)
+        .order_by(ProductPair.basket_count.desc(), desc("lift"))
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "product_pair": (product_id, other_id),
+            "names": (name, other_name),
+            "count": count,
+            "support": round(support, 4),
+            "lift": round(lift, 2)
+        }
+        for product_id, name, other_id, other_name, count, support, lift in rows
+    ]
+
+
+def bought_together_with(product_id, k=5, min_support=0.0, min_lift=1.0):
+    """Top-k products most often in the same basket as `product_id`."""
+    query = pair_query(min_support, min_lift)
+    if query is None:
+        return []
+
+    rows = (
+        query.filter(ProductPair.product_id == product_id)
+        .order_by(ProductPair.basket_count.desc())
+        .limit(k)
+        .all()
+    )
+    return [
+        {
+            "product_id": other_id,
+            "name": other_name,
+            "count": count,
+            "support": round(support, 4),
+            "lift": round(lift, 2)
+        }
+        for _, _, other_id, other_name, count, support, lift in rows
+    ]
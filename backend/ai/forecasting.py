@@ -0,0 +1,126 @@
+# ai/forecasting.py
+# Velocity-based restock forecasting: EWMA of daily units sold per product, updated incrementally.
+import threading
+from datetime import datetime
+
+import numpy as np
+from flask import current_app
+
+from models import db, Product, Order
+from ai.analytics import LoadedOrders
+
+MIN_VELOCITY = 1e-6  # Units/day; the EWMA only approaches zero, so anything slower counts as no sales
+
+
+class RestockForecaster:
+    """Keeps an exponentially weighted moving average of daily units sold per product.
+
+    Only orders not seen before are loaded on each refresh (see LoadedOrders);
+    the state is the EWMA up to the last closed day plus the open day's units.
+    An order committed late for an already closed day counts toward the open day.
+    """
+
+    def __init__(self, batch_size=10000):
+        self.batch_size = batch_size
+        self.loaded = LoadedOrders()
+        self.current_day = None  # Ordinal of the open (not yet averaged) day
+        self.ewma = np.zeros(0)  # Average daily units, up to the day before current_day
+        self.current_units = np.zeros(0)  # Units sold so far on current_day
+        self._lock = threading.Lock()
+
+    def _grow(self, size):
+        if size > len(self.ewma):
+            self.ewma = np.pad(self.ewma, (0, size - len(self.ewma)))
+            self.current_units = np.pad(self.current_units, (0, size - len(self.current_units)))
+
+    def _advance(self, day, alpha):
+        """Closes every day before `day`, folding the open day's units into the average."""
+        if self.current_day is None:
+            self.current_day = day
+            return
+        gap = day - self.current_day
+        if gap <= 0:
+            return
+        self.ewma = alpha * self.current_units + (1 - alpha) * self.ewma
+        self.ewma *= (1 - alpha) ** (gap - 1)  # Days with no sales at all
+        self.current_units[:] = 0
+        self.current_day = day
+
+    def refresh(self, alpha):
+        """Folds in orders added since the last refresh, then advances to today."""
+        query = (
+            db.session.query(Order.id, Order.product_id, Order.quantity, Order.timestamp)
+            .filter(Order.id > self.loaded.floor(), Order.timestamp.isnot(None))
+            .order_by(Order.timestamp)
+            .execution_options(yield_per=self.batch_size)
+        )
+        rows = [
+            (product_id, quantity, timestamp.toordinal())
+            for order_id, product_id, quantity, timestamp in query
+            if self.loaded.add(order_id)
+        ]
+        self.loaded.prune()
+        if rows:
+            product_ids, quantities, days = (np.array(column, dtype=np.int64) for column in zip(*rows))
+            self._grow(int(product_ids.max()) + 1)
+
+            # One bincount per distinct day, in date order
+            boundaries = np.flatnonzero(np.diff(days)) + 1
+            for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(days)]):
+                self._advance(int(days[start]), alpha)
+                self.current_units += np.bincount(
+                    product_ids[start:end], weights=quantities[start:end], minlength=len(self.current_units)
+                )
+
+        self._advance(datetime.utcnow().toordinal(), alpha)  # Order timestamps are UTC
+
+    def forecast(self, category=None, include_all=False, limit=None):
+        """Returns products ranked by days of stock cover, with suggested order quantities."""
+        config = current_app.config
+        lead_time = config["FORECAST_LEAD_TIME_DAYS"]
+        safety_days = config["FORECAST_SAFETY_DAYS"]
+        cover_days = config["FORECAST_COVER_DAYS"]
+
+        query = db.session.query(Product.id, Product.name, Product.category, Product.stock_quantity)
+        if category:
+            query = query.filter(Product.category == category)
+        products = query.all()
+        if not products:
+            return []
+
+        with self._lock:
+            self.refresh(config["FORECAST_ALPHA"])
+            ids = np.array([product_id for product_id, _, _, _ in products], dtype=np.int64)
+            self._grow(int(ids.max()) + 1)
+            velocity = self.ewma[ids]
+
+        # Vectorized over every product at once
+        stock = np.array([stock or 0 for _, _, _, stock in products], dtype=np.float64)
+        selling = velocity >= MIN_VELOCITY
+        velocity = np.where(selling, velocity, 0.0)
+        days_of_cover = np.full(len(products), np.inf)
+        np.divide(stock, velocity, out=days_of_cover, where=selling)
+        reorder_point = velocity * (lead_time + safety_days)
+        order_quantity = np.ceil(np.maximum(velocity * (lead_time + cover_days) - stock, 0))
+        needs_restock = selling & (stock <= reorder_point)
+
+        selected = np.arange(len(products)) if include_all else np.flatnonzero(needs_restock)
+        ranked = selected[np.argsort(days_of_cover[selected], kind="stable")][:limit]
+
+        return [
+            {
+                "product_id": products[i][0],
+                "name": products[i][1],
+                "category": products[i][2],
+                "stock_quantity": int(stock[i]),
+                "daily_velocity": round(float(velocity[i]), 3),
+                "days_of_cover": round(float(days_of_cover[i]), 1) if np.isfinite(days_of_cover[i]) else None,
+                "reorder_point": int(np.ceil(reorder_point[i])),
+                "suggested_order_quantity": int(order_quantity[i]),
+                "needs_restock": bool(needs_restock[i])
+            }
+            for i in ranked
+        ]
+
+
+forecaster = RestockForecaster()
@@ -1,61 +1,72 @@
 # ai/recommender.py
-from sqlalchemy.orm import aliased
-
-from models import db, Product, Order  # Make sure db is imported from models
+from models import db, Product, Order, ProductSalesSummary, CategorySalesSummary, ProductMonthlySales  # Make sure db is imported from models
 
 from sqlalchemy import func
 
+from ai.cooccurrence import top_pairs
+
+
+def in_window(query, start=None, end=None):
+    """Limits an Order query to start <= timestamp < end (either bound optional)."""
+    if start is not None:
+        query = query.filter(Order.timestamp >= start)
+    if end is not None:
+        query = query.filter(Order.timestamp < end)
+    return query
+
+
 # Function to get top-selling products
-def get_top_selling_products():
-    top_sellers = db.session.query(
-        Product.name,
-        func.sum(Order.quantity).label('total_sold')
-    ) \
-        .join(Order, Order.product_id == Product.id) \
-        .group_by(Product.id) \
-        .order_by(func.sum(Order.quantity).desc()) \
-        .limit(5) \
-        .all()
+# Without a date window this reads the sales summary; with one it aggregates the matching orders.
+def get_top_selling_products(limit=5, category=None, start=None, end=None):
+    if start is None and end is None:
+        total_sold = ProductSalesSummary.units_sold
+        query = db.session.query(Product.name, total_sold.label('total_sold')) \
+            .join(ProductSalesSummary, ProductSalesSummary.product_id == Product.id) \
+            .filter(total_sold > 0)
+    else:
+        total_sold = func.sum(Order.quantity)
+        query = in_window(
+            db.session.query(Product.name, total_sold.label('total_sold'))
+            .join(Order, Order.product_id == Product.id),
+            start, end
+        ).group_by(Product.id)
+
+    if category:
+        query = query.filter(Product.category == category)
+
+    top_sellers = query.order_by(total_sold.desc()).limit(limit).all()
     return [{"name": name, "total_sold": total_sold} for name, total_sold in top_sellers]
 
 # Function to get restock suggestions
-def get_restock_suggestions():
-    low_stock_products = Product.query.filter(Product.stock_quantity < 10).all()
-    return [product.name for product in low_stock_products]
+def get_restock_suggestions(threshold=10, limit=None, category=None):
+    query = db.session.query(Product.name).filter(Product.stock_quantity < threshold)
+    if category:
+        query = query.filter(Product.category == category)
+    low_stock_products = query.order_by(Product.stock_quantity).limit(limit).all()
+    return [name for name, in low_stock_products]
 
 # Function to get frequently bought together items
-# A simple example for Frequently Bought Together: Get pairs of products bought together
-
-def get_frequently_bought_together():
-    # Create an alias for the Order table to join it with itself
-    Order2 = aliased(Order)
-
-    # Efficiently query product pairs from the same order
-    frequently_bought = db.session.query(
-        Order.product_id.label('product_1'),
-        Order2.product_id.label('product_2'),
-        func.count().label('pair_count')
-    ).join(
-        Order2, Order.id == Order2.id  # Self-join on the Order table to pair products within the same order
-    ).filter(
-        Order.product_id != Order2.product_id  # Filter to avoid pairing the same product
-    ).group_by(
-        'product_1', 'product_2'  # Group by product 1 and product 2
-    ).order_by(
-        func.count().desc()  # Sort by frequency of pairs
-    ).all()
-
-    return [{"product_pair": (product_1, product_2), "count": count} for product_1, product_2, count in frequently_bought]
+# Pairs of products sold in the same basket, counted incrementally by ai/cooccurrence.py
+
+def get_frequently_bought_together(limit=10, min_support=0.0, min_lift=1.0):
+    return top_pairs(limit=limit, min_support=min_support, min_lift=min_lift)
 
 
 # Function to get category trends
-def get_category_trends():
-    category_trends = db.session.query(
-        Product.category, func.sum(Order.quantity).label('total_sold')
-    ).join(Order, Order.product_id == Product.id) \
-     .group_by(Product.category) \
-     .order_by(func.sum(Order.quantity).desc()) \
-     .all()
+def get_category_trends(limit=None, start=None, end=None):
+    if start is None and end is None:
+        total_sold = CategorySalesSummary.units_sold
+        query = db.session.query(CategorySalesSummary.category, total_sold.label('total_sold')) \
+            .filter(CategorySalesSummary.order_count > 0)
+    else:
+        total_sold = func.sum(Order.quantity)
+        query = in_window(
+            db.session.query(Product.category, total_sold.label('total_sold'))
+            .join(Order, Order.product_id == Product.id),
+            start, end
+        ).group_by(Product.category)
+
+    category_trends = query.order_by(total_sold.desc()).limit(limit).all()
 
     # Handle the case where there are no sales for a category
     if not category_trends:
@@ -65,19 +76,42 @@ def get_category_trends():
 
 
 # Function to get time-based recommendations (e.g., seasonal)
-def get_time_based_recommendations():
-    time_based_recommendations = db.session.query(
+def get_time_based_recommendations(month=None, limit=None, category=None):
+    # Read from the monthly rollup, which is far smaller than the order table
+    total_sold = func.sum(ProductMonthlySales.units_sold)
+    columns = [
         Product.name,
-        func.sum(Order.quantity).label('total_sold'),
-        func.extract('month', Order.timestamp).label('month')
-    ).join(Order, Order.product_id == Product.id) \
-     .group_by(Product.id, 'month') \
-     .order_by('month', func.sum(Order.quantity).desc()) \
-     .all()
+        total_sold.label('total_sold'),
+        ProductMonthlySales.calendar_month.label('month')
+    ]
+    per_month_limit = limit is not None and month is None
+    if per_month_limit:
+        # `limit` applies to each month, not to the whole list
+        columns.append(func.row_number().over(
+            partition_by=ProductMonthlySales.calendar_month, order_by=total_sold.desc()
+        ).label('rank'))
+    query = db.session.query(*columns).join(ProductMonthlySales, ProductMonthlySales.product_id == Product.id)
+
+    if month is not None:
+        query = query.filter(ProductMonthlySales.calendar_month == month)
+    if category:
+        query = query.filter(Product.category == category)
+
+    query = query.group_by(Product.id, ProductMonthlySales.calendar_month)
+    if per_month_limit:
+        ranked = query.subquery()
+        time_based_recommendations = db.session.query(ranked.c.name, ranked.c.total_sold, ranked.c.month) \
+         .filter(ranked.c.rank <= limit) \
+         .order_by(ranked.c.month, ranked.c.rank) \
+         .all()
+    else:
+        time_based_recommendations = query \
+         .order_by(ProductMonthlySales.calendar_month, total_sold.desc()) \
+         .limit(limit) \
+         .all()
 
     # Handle empty results
     if not time_based_recommendations:
         return [{"name": "No data", "total_sold": 0, "month": "Unknown"}]
     
     return [{"name": name, "total_sold": total_sold, "month": month} for name, total_sold, month in time_based_recommendations]
-
@@ -0,0 +1,112 @@
+# ai/seasonality.py
+# Seasonal and trending product queries, answered from the per-product sales rollups.
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, case
+
+from models import db, Product, ProductDailySales, ProductMonthlySales
+
+
+def top_by_calendar_month(k=5, category=None):
+    """Top-k products for each month of the year (January, February, ...) across all years."""
+    total_sold = func.sum(ProductMonthlySales.units_sold)
+    ranked = (
+        db.session.query(
+            ProductMonthlySales.calendar_month.label("calendar_month"),
+            ProductMonthlySales.product_id.label("product_id"),
+            total_sold.label("total_sold"),
+            func.row_number().over(
+                partition_by=ProductMonthlySales.calendar_month, order_by=total_sold.desc()
+            ).label("rank")
+        )
+        .join(Product, Product.id == ProductMonthlySales.product_id)
+    )
+    if category:
+        ranked = ranked.filter(Product.category == category)
+    ranked = ranked.group_by(ProductMonthlySales.calendar_month, ProductMonthlySales.product_id).subquery()
+
+    rows = (
+        db.session.query(ranked.c.calendar_month, Product.name, ranked.c.total_sold)
+        .join(Product, Product.id == ranked.c.product_id)
+        .filter(ranked.c.rank <= k)
+        .order_by(ranked.c.calendar_month, ranked.c.rank)
+        .all()
+    )
+
+    months = {}
+    for month, name, total_sold in rows:
+        months.setdefault(month, []).append({"name": name, "total_sold": total_sold})
+    return [{"month": month, "products": products} for month, products in months.items()]
+
+
+def window_totals(windows, category=None):
+    """Units sold per product in each [start, end) day window, from the daily rollup.
+
+    Returns rows of (product_id, name, units per window...).
+    """
+    columns = [
+        func.sum(case(
+            ((ProductDailySales.day >= start) & (ProductDailySales.day < end), ProductDailySales.units_sold),
+            else_=0
+        ))
+        for start, end in windows
+    ]
+    query = (
+        db.session.query(ProductDailySales.product_id, Product.name, *columns)
+        .join(Product, Product.id == ProductDailySales.product_id)
+        .filter(ProductDailySales.day >= min(start for start, _ in windows))
+        .filter(ProductDailySales.day < max(end for _, end in windows))
+    )
+    if category:
+        query = query.filter(Product.category == category)
+    return query.group_by(ProductDailySales.product_id, Product.name).all()
+
+
+def change(current, previous):
+    """Percentage change, or None when there is nothing to compare against."""
+    return round((current - previous) * 100.0 / previous, 1) if previous else None
+
+
+def month_to_date_vs_last_year(k=5, category=None):
+    """Top-k products this month so far, next to the same dates last year."""
+    today = datetime.utcnow().date()
+    tomorrow = today + timedelta(days=1)
+    month_start = today.replace(day=1)
+    try:
+        last_year = (month_start.replace(year=month_start.year - 1), tomorrow.replace(year=tomorrow.year - 1))
+    except ValueError:  # Tomorrow is 29 February: last year's window runs through 28 February
+        last_year = (month_start.replace(year=month_start.year - 1), date(tomorrow.year - 1, 3, 1))
+
+    rows = window_totals([(month_start, tomorrow), last_year], category)
+    rows = sorted((row for row in rows if row[2] > 0), key=lambda row: row[2], reverse=True)[:k]
+    return [
+        {
+            "product_id": product_id,
+            "name": name,
+            "units_this_year": current,
+            "units_last_year": previous,
+            "change_percent": change(current, previous)
+        }
+        for product_id, name, current, previous in rows
+    ]
+
+
+def trending_up(k=5, days=28, category=None):
+    """Products whose units over the last `days` days grew the most versus the `days` before."""
+    today = datetime.utcnow().date()
+    tomorrow = today + timedelta(days=1)
+    recent = (tomorrow - timedelta(days=days), tomorrow)
+    previous = (recent[0] - timedelta(days=days), recent[0])
+
+    rows = window_totals([recent, previous], category)
+    rows = sorted((row for row in rows if row[2] > row[3]), key=lambda row: row[2] - row[3], reverse=True)[:k]
+    return [
+        {
+            "product_id": product_id,
+            "name": name,
+            "units_recent": current,
+            "units_previous": before,
+            "change_percent": change(current, before)
+        }
+        for product_id, name, current, before in rows
+    ]
@@ -0,0 +1,242 @@
+# ai/snapshots.py
+# Precomputed recommendation payloads, refreshed in the background instead of per request.
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
+
+from models import db, Order, RecommendationSnapshot
+from ai.recommender import (
+    get_top_selling_products,
+    get_restock_suggestions,
+    get_frequently_bought_together,
+    get_category_trends,
+    get_time_based_recommendations
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ID = 1  # Only the latest snapshot is kept
+
+
+PAYLOAD_KEYS = (
+    "top_sellers",
+    "restock_suggestions",
+    "frequently_bought_together",
+    "category_trends",
+    "time_based_recommendations"
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Shared thread pool for running recommendation sections concurrently."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config["RECOMMENDATIONS_WORKERS"],
+                thread_name_prefix="recommendations"
+            )
+        return _executor
+
+
+def shutdown_executor():
+    """Stops the recommendation thread pool (on server shutdown); it is recreated if used again."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def recommendation_sections():
+    """Independent units of work, each returning a dict of payload keys."""
+    sections = {
+        "restock_suggestions": lambda: {"restock_suggestions": get_restock_suggestions()},
+        "frequently_bought_together": lambda: {"frequently_bought_together": get_frequently_bought_together()}
+    }
+    if current_app.config["ANALYTICS_ENGINE"] == "numpy":
+        # Order-based sections come from one in-memory pass over the order columns
+        from ai.analytics import engine
+        from ai.forecasting import forecaster
+        sections["order_analytics"] = engine.recommendations
+        sections["restock_suggestions"] = lambda: {
+            "restock_suggestions": [product["name"] for product in forecaster.forecast()]
+        }
+    else:
+        sections["top_sellers"] = lambda: {"top_sellers": get_top_selling_products()}
+        sections["category_trends"] = lambda: {"category_trends": get_category_trends()}
+        sections["time_based_recommendations"] = lambda: {"time_based_recommendations": get_time_based_recommendations()}
+    return sections
+
+
+def compute_recommendations(previous=None):
+    """Runs the recommendation sections in parallel and returns (payload, errors).
+
+    Each section runs in its own app context (and so its own database session).
+    A section that fails or exceeds RECOMMENDATIONS_SECTION_TIMEOUT is reported
+    in `errors` and keeps its value from the `previous` payload, if any.
+    """
+    app = current_app._get_current_object()
+
+    def run(section):
+        with app.app_context():
+            return section()
+
+    futures = {name: get_executor().submit(run, section) for name, section in recommendation_sections().items()}
+    deadline = time.monotonic() + app.config["RECOMMENDATIONS_SECTION_TIMEOUT"]
+
+    payload = {}
+    errors = {}
+    for name, future in futures.items():
+        try:
+            payload.update(future.result(timeout=max(0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            future.cancel()
+            errors[name] = "timed out"
+        except Exception as e:
+            logger.exception("Recommendation section %s failed", name)
+            errors[name] = str(e)
+
+    for key in PAYLOAD_KEYS:
+        if key not in payload:
+            payload[key] = (previous or {}).get(key, [])
+    return payload, errors
+
+
+def refresh_snapshot():
+    """Recomputes the recommendations and stores them as the latest snapshot."""
+    last_order_id = db.session.query(func.max(Order.id)).scalar() or 0
+    computed_at = datetime.utcnow()
+
+    snapshot = db.session.get(RecommendationSnapshot, SNAPSHOT_ID) or RecommendationSnapshot(id=SNAPSHOT_ID)
+    recommendations, errors = compute_recommendations(json.loads(snapshot.payload) if snapshot.payload else None)
+
+    # The ETag only covers the recommendations, so an unchanged recompute keeps client copies valid
+    digest = hashlib.sha256(current_app.json.dumps(recommendations, sort_keys=True).encode("utf-8"))
+    snapshot.etag = digest.hexdigest()[:32]
+    snapshot.payload = current_app.json.dumps({
+        **recommendations,
+        "computed_at": computed_at.strftime("%Y-%m-%d %H:%M:%S"),
+        **({"errors": errors} if errors else {})
+    })
+    snapshot.computed_at = computed_at
+    snapshot.last_order_id = last_order_id
+    snapshot.refresh_claimed_at = None
+    db.session.add(snapshot)
+    db.session.commit()
+    return snapshot
+
+
+def get_snapshot():
+    """Returns the latest snapshot, computing the first one if none exists yet.
+
+    The payload is only loaded when accessed, so answering a conditional GET
+    with 304 never reads it.
+    """
+    snapshot = db.session.get(RecommendationSnapshot, SNAPSHOT_ID, options=[defer(RecommendationSnapshot.payload)])
+    if snapshot is not None:
+        return snapshot
+    try:
+        return refresh_snapshot()
+    except IntegrityError:
+        # Another request or the background refresher stored the first snapshot meanwhile
+        db.session.rollback()
+        return db.session.get(RecommendationSnapshot, SNAPSHOT_ID)
+
+
+def claim_refresh():
+    """Claims the next refresh of the existing snapshot; False if another worker holds the claim.
+
+    The claim lapses after RECOMMENDATIONS_REFRESH_LEASE seconds, so a worker
+    that dies mid-refresh doesn't block the others for good.
+    """
+    now = datetime.utcnow()
+    lease_start = now - timedelta(seconds=current_app.config["RECOMMENDATIONS_REFRESH_LEASE"])
+    table = RecommendationSnapshot.__table__
+    claimed = db.session.execute(
+        update(table)
+        .where(table.c.id == SNAPSHOT_ID)
+        .where(or_(table.c.refresh_claimed_at.is_(None), table.c.refresh_claimed_at < lease_start))
+        .values(refresh_claimed_at=now)
+    ).rowcount
+    db.session.commit()
+    return claimed == 1
+
+
+def snapshot_is_stale(snapshot):
+    """True once the snapshot is older than the refresh interval or enough new orders arrived."""
+    if snapshot is None:
+        return True
+    config = current_app.config
+    if datetime.utcnow() - snapshot.computed_at >= timedelta(seconds=config["RECOMMENDATIONS_REFRESH_INTERVAL"]):
+        return True
+    last_order_id = db.session.query(func.max(Order.id)).scalar() or 0
+    return last_order_id - snapshot.last_order_id >= config["RECOMMENDATIONS_REFRESH_ORDERS"]
+
+
+class SnapshotRefresher:
+    """Background thread that refreshes the snapshot whenever it goes stale.
+
+    Staleness is checked against the database, and a worker claims the
+    refresh (claim_refresh) before recomputing, so when several workers each
+    run a refresher, only the first to notice a stale snapshot recomputes it.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        if app.config.get("RECOMMENDATIONS_BACKGROUND_REFRESH", True):
+            # Started on the first request, so CLI commands (migrations etc.) never spawn it
+            app.before_request(self.start)
+
+    def start(self):
+        if self._thread is not None or self._stopping.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="recommendation-refresher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """Asks the thread to exit and waits for a refresh in progress to finish."""
+        self._stopping.set()
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        poll_interval = self.app.config["RECOMMENDATIONS_POLL_INTERVAL"]
+        while not self._stopping.is_set():
+            try:
+                with self.app.app_context():
+                    snapshot = db.session.get(RecommendationSnapshot, SNAPSHOT_ID)
+                    if snapshot is None:
+                        get_snapshot()
+                    elif snapshot_is_stale(snapshot) and claim_refresh():
+                        refresh_snapshot()
+            except Exception:
+                logger.exception("Failed to refresh recommendation snapshot")
+            self._stopping.wait(poll_interval)
+
+
+refresher = SnapshotRefresher()
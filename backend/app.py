@@ -4,44 +4,105 @@ from flask_restful import Api
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 from models import db
+from cache import cache
+from ai.snapshots import refresher, shutdown_executor
 from routes.auth_routes import auth  # Import authentication routes
 from routes.sys_routes import routes  # Import routes from routes.py
 from routes.ai_routes import ai_bp  # Import the AI routes
+from summaries import rebuild_sales_summaries, prune_daily_rollups
+from search import create_search_index, include_schema_object
+from revocation import revocation_store
+from passwords import password_hasher
+from ratelimit import rate_limiter
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config.from_object("config.Config")
 
-# Initialize Database & Migrations Properly
-db.init_app(app)
-migrate = Migrate(app, db)
+def create_app(config_object="config.Config"):
+    """Builds the Flask app. The extensions are module-level singletons, so build one app per process."""
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    if app.config["TRUSTED_PROXIES"]:
+        # request.remote_addr then comes from X-Forwarded-For
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["TRUSTED_PROXIES"])
 
-# Initialize API & CORS Before Registering Blueprints
-api = Api(app)
-CORS(app)
+    # Initialize Database & Migrations Properly
+    db.init_app(app)
+    Migrate(app, db, include_name=include_schema_object)  # The search index is managed by search.py
+    cache.init_app(app)
+    refresher.init_app(app)
 
-# Set Up JWT Secret Key Before Initializing JWT
-app.config["JWT_SECRET_KEY"] = "your_secret_key"  
-jwt = JWTManager(app)
+    # Initialize API & CORS Before Registering Blueprints
+    Api(app)
+    CORS(app)
 
-# Register Blueprints
-app.register_blueprint(auth, url_prefix="/auth")
-app.register_blueprint(routes)  # Register routes from routes.py
-app.register_blueprint(ai_bp, url_prefix="/api/ai")  # Register AI blueprint
+    # Set Up JWT Secret Key Before Initializing JWT
+    app.config["JWT_SECRET_KEY"] = "your_secret_key"
+    jwt = JWTManager(app)
+    revocation_store.init_app(app, jwt)  # Refuses logged-out tokens
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
 
+    # Register Blueprints
+    app.register_blueprint(auth, url_prefix="/auth")
+    app.register_blueprint(routes)  # Register routes from routes.py
+    app.register_blueprint(ai_bp, url_prefix="/api/ai")  # Register AI blueprint
 
-# Run Flask App
-#if __name__ == "__main__":
-    #app.run(debug=True)
-    
+    register_commands(app)
+    return app
+
+
+def register_commands(app):
+    """Adds the maintenance commands to `flask`."""
+    # CLI: flask rebuild-summaries
+    @app.cli.command("rebuild-summaries")
+    def rebuild_summaries_command():
+        """Backfills the sales summary tables from the full order history."""
+        rebuild_sales_summaries()
+        print("Sales summaries rebuilt.")
+
+    # CLI: flask prune-rollups
+    @app.cli.command("prune-rollups")
+    def prune_rollups_command():
+        """Drops per-product daily sales rows older than ROLLUP_DAILY_RETENTION_DAYS."""
+        print(f"Pruned {prune_daily_rollups()} daily rollup rows.")
+
+    # CLI: flask rebuild-search-index
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index_command():
+        """Creates (SQLite) and refills the product search index."""
+        create_search_index()
+        print("Product search index rebuilt.")
+
+    # CLI: flask prune-revoked-tokens
+    @app.cli.command("prune-revoked-tokens")
+    def prune_revoked_tokens_command():
+        """Deletes revoked tokens that have expired (workers also do this every REVOCATION_PRUNE_INTERVAL)."""
+        print(f"Pruned {revocation_store.prune()} expired revoked tokens.")
+
+
+def shutdown(app):
+    """Stops this process's background work; the servers in serve.py call it when a worker exits."""
+    refresher.stop(timeout=app.config["SERVER_GRACEFUL_TIMEOUT"])
+    shutdown_executor()
+    password_hasher.shutdown()  # Lets hashes in flight finish
+    with app.app_context():
+        db.engine.dispose()
+
+
+# Module-level app for `flask` CLI commands, scripts (seed.py) and wsgi.py
+app = create_app()
+
+
+# Development server only; run `python serve.py` in production
 if __name__ == "__main__":
     with app.app_context():  
         db.create_all()  # Ensure tables exist
+        create_search_index()
 
         # Add this at the bottom of app.py, before app.run()
         print("Registered routes:")
         for rule in app.url_map.iter_rules():
             print(f"{rule} -> {rule.endpoint}")
 
-    app.run(debug=True)
+    app.run(debug=app.config["DEBUG"])
@@ -0,0 +1,35 @@
+# asgi.py
+# ASGI adapter: serves the Flask app from an ASGI server (`uvicorn asgi:application`, see serve.py).
+import asyncio
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:
+    raise RuntimeError("The ASGI entry point requires the a2wsgi package")
+
+from app import app, shutdown
+
+
+class FlaskASGI:
+    """Runs each HTTP request on a pool of SERVER_THREADS threads, and the app's shutdown at lifespan end."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.http = WSGIMiddleware(flask_app, workers=flask_app.config["SERVER_THREADS"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "lifespan":
+            return await self.http(scope, receive, send)
+
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # The server has stopped taking requests and drained them (SERVER_GRACEFUL_TIMEOUT)
+                await asyncio.get_running_loop().run_in_executor(None, shutdown, self.flask_app)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+application = FlaskASGI(app)
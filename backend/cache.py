@@ -0,0 +1,186 @@
+# cache.py
+# Response cache for read-heavy endpoints, invalidated by the write endpoints.
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, g, make_response, request
+
+
+def request_key():
+    """Identifies a GET response: endpoint, path and sorted query params (shared with the ETags in versions.py)."""
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    return f"{request.endpoint}:{request.path}?{params}"
+
+
+class LRUBackend:
+    """In-process LRU store where every entry expires after a TTL."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._counters = {}  # kept apart from the entries so eviction never resets them
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            expires_at = time.monotonic() + ttl if ttl else None
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class SharedBackend:
+    """Store shared between workers, backed by a Redis-compatible client.
+
+    Any client exposing get/set(ex=)/delete/incr works, so tests and local
+    development can pass a stand-in instead of a real Redis server.
+    """
+
+    def __init__(self, client, prefix="inventory-cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+
+class ResponseCache:
+    """Caches successful responses of GET views, keyed per endpoint and query params.
+
+    Views are tagged with one or more namespaces; `invalidate(namespace)` bumps
+    that namespace's generation, which orphans every key built with the old one.
+    Under versions.conditional, keys use the catalog versions it read instead:
+    those are shared by every worker, so a body never outlives its ETag.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = None
+        self.enabled = False
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("CACHE_ENABLED", True)
+        self.ttl = app.config.get("CACHE_TTL", 60)
+
+        backend = app.config.get("CACHE_BACKEND", "memory")
+        if backend == "memory":
+            self.backend = LRUBackend(app.config.get("CACHE_MAX_ENTRIES", 1024))
+        elif backend == "redis":
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND='redis' requires the redis package")
+            self.backend = SharedBackend(redis.Redis.from_url(app.config["CACHE_URL"]))
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+        app.extensions["response_cache"] = self
+
+    def _generation(self, namespace):
+        return self.backend.counter(f"generation:{namespace}")
+
+    def _generations(self, namespaces):
+        versions = g.get("catalog_versions", {})  # Set by versions.conditional for this request
+        return ",".join(
+            f"{ns}@{versions[ns][0]}" if ns in versions else f"{ns}={self._generation(ns)}"
+            for ns in namespaces
+        )
+
+    def _count(self, endpoint, outcome):
+        with self._stats_lock:
+            counters = self._stats.setdefault(endpoint, {"hits": 0, "misses": 0})
+            counters[outcome] += 1
+
+    def cached(self, *namespaces):
+        """Decorator caching a view's 200 responses until one of `namespaces` is invalidated."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or self.backend is None:
+                    return view(*args, **kwargs)
+
+                key = f"response:{self._generations(namespaces)}:{request_key()}"
+
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self._count(request.endpoint, "hits")
+                    body, status, mimetype = entry
+                    return Response(body, status=status, mimetype=mimetype)
+
+                self._count(request.endpoint, "misses")
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    self.backend.set(key, (response.get_data(), response.status_code, response.mimetype), self.ttl)
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self, *namespaces):
+        """Drops every cached response tagged with any of `namespaces`."""
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            self.backend.incr(f"generation:{namespace}")
+
+    def stats(self):
+        """Returns hit/miss counters per endpoint plus totals."""
+        with self._stats_lock:
+            endpoints = {endpoint: dict(counters) for endpoint, counters in self._stats.items()}
+        hits = sum(counters["hits"] for counters in endpoints.values())
+        misses = sum(counters["misses"] for counters in endpoints.values())
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "endpoints": endpoints
+        }
+
+
+cache = ResponseCache()
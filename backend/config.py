@@ -1,9 +1,101 @@
 import os
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+CPU_COUNT = os.cpu_count() or 1
 
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key")  # Use environment variable for security
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", 'sqlite:///' + os.path.join(BASE_DIR, 'database.db'))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False  # Set to True for debugging queries
+
+    # Pagination for the /sales endpoint
+    SALES_PAGE_SIZE = int(os.getenv("SALES_PAGE_SIZE", 100))
+    SALES_PAGE_MAX_SIZE = int(os.getenv("SALES_PAGE_MAX_SIZE", 1000))
+
+    # Page size for /products/search (default and upper bound)
+    SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", 25))
+    SEARCH_PAGE_MAX_SIZE = int(os.getenv("SEARCH_PAGE_MAX_SIZE", 100))
+
+    # Rows fetched per round trip when streaming /sales/export
+    SALES_EXPORT_BATCH_SIZE = int(os.getenv("SALES_EXPORT_BATCH_SIZE", 1000))
+
+    # Maximum number of lines accepted by a single /checkout request
+    CHECKOUT_MAX_LINES = int(os.getenv("CHECKOUT_MAX_LINES", 100))
+
+    # Rows committed per transaction by /products/import
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 500))
+
+    # Response cache for read endpoints ("memory" LRU per process, or "redis" shared by workers)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+    CACHE_TTL = int(os.getenv("CACHE_TTL", 60))  # Seconds
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+
+    # Background refresh of the /api/ai/recommendations snapshot
+    RECOMMENDATIONS_BACKGROUND_REFRESH = os.getenv("RECOMMENDATIONS_BACKGROUND_REFRESH", "true").lower() == "true"
+    RECOMMENDATIONS_REFRESH_INTERVAL = int(os.getenv("RECOMMENDATIONS_REFRESH_INTERVAL", 300))  # Seconds
+    RECOMMENDATIONS_REFRESH_ORDERS = int(os.getenv("RECOMMENDATIONS_REFRESH_ORDERS", 100))  # New orders
+    RECOMMENDATIONS_POLL_INTERVAL = int(os.getenv("RECOMMENDATIONS_POLL_INTERVAL", 10))  # Seconds
+    RECOMMENDATIONS_REFRESH_LEASE = int(os.getenv("RECOMMENDATIONS_REFRESH_LEASE", 120))  # Seconds a claim blocks other workers
+    RECOMMENDATIONS_WORKERS = int(os.getenv("RECOMMENDATIONS_WORKERS", 5))  # Sections computed in parallel
+    RECOMMENDATIONS_SECTION_TIMEOUT = float(os.getenv("RECOMMENDATIONS_SECTION_TIMEOUT", 10))  # Seconds
+    RECOMMENDATIONS_MAX_LIMIT = int(os.getenv("RECOMMENDATIONS_MAX_LIMIT", 100))  # Rows per section endpoint
+
+    # "numpy" computes order-based recommendations from in-memory columns, "sql" runs one query per section
+    ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "numpy")
+
+    # Restock forecasting (ai/forecasting.py)
+    FORECAST_ALPHA = float(os.getenv("FORECAST_ALPHA", 0.3))  # EWMA weight of the latest day
+    FORECAST_LEAD_TIME_DAYS = int(os.getenv("FORECAST_LEAD_TIME_DAYS", 7))  # Days for a reorder to arrive
+    FORECAST_SAFETY_DAYS = int(os.getenv("FORECAST_SAFETY_DAYS", 3))  # Extra days of safety stock
+    FORECAST_COVER_DAYS = int(os.getenv("FORECAST_COVER_DAYS", 14))  # Days of sales a reorder should cover
+
+    # Per-product daily sales rows older than this are dropped by `flask prune-rollups` (monthly rows are kept)
+    ROLLUP_DAILY_RETENTION_DAYS = int(os.getenv("ROLLUP_DAILY_RETENTION_DAYS", 400))
+
+    # Seconds a user's existence/role is cached for role checks (see permissions.py)
+    AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", 30))
+
+    # Token revocation (revocation.py): how often each worker pulls new revocations, and prunes expired ones
+    REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", 1))  # Seconds
+    REVOCATION_SYNC_OVERLAP = int(os.getenv("REVOCATION_SYNC_OVERLAP", 30))  # Seconds re-read on each sync
+    REVOCATION_PRUNE_INTERVAL = int(os.getenv("REVOCATION_PRUNE_INTERVAL", 3600))  # Seconds
+
+    # Password hashing (passwords.py): bcrypt work factor, pool processes, and how many hashes may be in flight.
+    # The pool and its limits are per server process; by default the cores are split across SERVER_WORKERS.
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))  # Changing it rehashes passwords at next login
+    PASSWORD_HASH_WORKERS = int(os.getenv(
+        "PASSWORD_HASH_WORKERS", max(1, CPU_COUNT // int(os.getenv("SERVER_WORKERS", CPU_COUNT)))
+    ))  # 0 hashes on the request thread
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5))  # Seconds, then 503
+
+    # Token-bucket limits on /auth/login and /auth/forgot-password, per client IP and per email.
+    # A whole store behind one NAT shares its IP bucket, so that one is kept far above the per-email one.
+    # With the "memory" backend every server process has its own buckets: the limits multiply by SERVER_WORKERS.
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" per process, or "redis" shared
+    RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL", os.getenv("CACHE_URL", "redis://localhost:6379/0"))
+    AUTH_IP_BURST = int(os.getenv("AUTH_IP_BURST", 300))  # Attempts allowed back to back
+    AUTH_IP_PER_MINUTE = float(os.getenv("AUTH_IP_PER_MINUTE", 120))  # Attempts regained per minute
+    AUTH_EMAIL_BURST = int(os.getenv("AUTH_EMAIL_BURST", 5))
+    AUTH_EMAIL_PER_MINUTE = float(os.getenv("AUTH_EMAIL_PER_MINUTE", 2))
+
+    # Reverse proxies in front of the app that append X-Forwarded-For; behind one, set this so the
+    # client IP (and its rate-limit bucket) is the real client's rather than the proxy's
+    TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", 0))
+
+    # Werkzeug debugger and reloader for `python app.py` (never enable on a reachable host)
+    DEBUG = os.getenv("FLASK_DEBUG", "false").lower() == "true"
+
+    # Production server (serve.py): "gunicorn", "waitress" (single process, e.g. Windows) or "asgi" (uvicorn)
+    SERVER = os.getenv("SERVER", "gunicorn")
+    SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:5000")
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", CPU_COUNT))  # Processes, one per core
+    SERVER_THREADS = int(os.getenv("SERVER_THREADS", 8))  # Requests handled at once by each process
+    SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", 5))  # Seconds an idle client connection stays open
+    SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", 60))  # Seconds before a stuck gunicorn worker is restarted
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30))  # Seconds to finish requests on shutdown
+    SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", 0))  # Recycle a worker after this many (0 = never)
@@ -0,0 +1,29 @@
+# gunicorn.conf.py
+# Gunicorn settings from config.Config: SERVER_WORKERS processes, each serving SERVER_THREADS requests at once.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config  # noqa: E402
+
+wsgi_app = "wsgi:application"
+bind = Config.SERVER_BIND
+workers = Config.SERVER_WORKERS
+worker_class = "gthread"  # Threaded workers: most of a request is spent waiting on the database
+threads = Config.SERVER_THREADS
+keepalive = Config.SERVER_KEEPALIVE  # POS terminals reuse their connection between calls
+timeout = Config.SERVER_TIMEOUT
+graceful_timeout = Config.SERVER_GRACEFUL_TIMEOUT  # On SIGTERM, workers finish their requests before exiting
+max_requests = Config.SERVER_MAX_REQUESTS
+max_requests_jitter = Config.SERVER_MAX_REQUESTS // 10  # So the workers don't all restart at once
+
+# Each worker builds its own app after the fork, so no database connection or thread is shared between processes
+preload_app = False
+
+
+def worker_exit(server, worker):
+    """Stops the worker's background threads and pools after its last request."""
+    if "app" in sys.modules:
+        from app import app, shutdown
+        shutdown(app)
@@ -0,0 +1,35 @@
+"""Added catalog version table
+
+Revision ID: 0a7c5e93d4b6
+Revises: f6d03a8b1c72
+Create Date: 2026-10-18 16:27:05.731942
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7c5e93d4b6'
+down_revision = 'f6d03a8b1c72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_version = op.create_table('catalog_version',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    now = datetime.utcnow()
+    op.bulk_insert(catalog_version, [
+        {'name': name, 'version': 1, 'updated_at': now} for name in ('products', 'stock', 'sales')
+    ])
+
+
+def downgrade():
+    op.drop_table('catalog_version')
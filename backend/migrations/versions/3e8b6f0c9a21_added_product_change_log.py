@@ -0,0 +1,49 @@
+"""Added product change log
+
+Revision ID: 3e8b6f0c9a21
+Revises: 0a7c5e93d4b6
+Create Date: 2026-10-18 17:05:41.902316
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e8b6f0c9a21'
+down_revision = '0a7c5e93d4b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_change',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(length=10), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    with op.batch_alter_table('product_change', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_change_version'), ['version'], unique=False)
+
+    # Existing products all belong to the first version, so since=0 returns the whole catalog
+    now = datetime.utcnow()
+    catalog_version = sa.table('catalog_version', sa.column('name'), sa.column('version'), sa.column('updated_at'))
+    op.bulk_insert(catalog_version, [{'name': 'changes', 'version': 1, 'updated_at': now}])
+    op.execute(
+        sa.text(
+            "INSERT INTO product_change (product_id, version, operation, changed_at) "
+            "SELECT id, 1, 'upsert', :now FROM product"
+        ).bindparams(now=now)
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM catalog_version WHERE name = 'changes'")
+    with op.batch_alter_table('product_change', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_change_version'))
+
+    op.drop_table('product_change')
@@ -0,0 +1,40 @@
+"""Added indexes for hot lookup paths
+
+Revision ID: 5d1e8f3a9b27
+Revises: c9b321d438bd
+Create Date: 2026-10-18 10:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1e8f3a9b27'
+down_revision = 'c9b321d438bd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Note: the unique index fails if the product table already holds duplicate
+    # (name, brand, category) rows; merge them before upgrading.
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.create_index('ix_product_category', ['category'], unique=False)
+        batch_op.create_index('ix_product_name_brand_category', ['name', 'brand', 'category'], unique=True)
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.create_index('ix_order_user_id', ['user_id'], unique=False)
+        batch_op.create_index('ix_order_timestamp', ['timestamp'], unique=False)
+        batch_op.create_index('ix_order_product_id_timestamp', ['product_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_product_id_timestamp')
+        batch_op.drop_index('ix_order_timestamp')
+        batch_op.drop_index('ix_order_user_id')
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_name_brand_category')
+        batch_op.drop_index('ix_product_category')
@@ -0,0 +1,69 @@
+"""Added sales summary tables
+
+Revision ID: 8c4f2a61d0e3
+Revises: 5d1e8f3a9b27
+Create Date: 2026-10-18 11:02:19.774310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4f2a61d0e3'
+down_revision = '5d1e8f3a9b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_sales_summary',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    with op.batch_alter_table('product_sales_summary', schema=None) as batch_op:
+        batch_op.create_index('ix_product_sales_summary_units_sold', ['units_sold'], unique=False)
+
+    op.create_table('category_sales_summary',
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category')
+    )
+    op.create_table('daily_sales_summary',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    # Backfill from existing orders (same as `flask rebuild-summaries`)
+    op.execute(
+        'INSERT INTO product_sales_summary (product_id, units_sold, revenue, order_count) '
+        'SELECT product_id, SUM(quantity), SUM(total_price), COUNT(id) FROM "order" GROUP BY product_id'
+    )
+    op.execute(
+        'INSERT INTO category_sales_summary (category, units_sold, revenue, order_count) '
+        'SELECT product.category, SUM("order".quantity), SUM("order".total_price), COUNT("order".id) '
+        'FROM product JOIN "order" ON "order".product_id = product.id GROUP BY product.category'
+    )
+    op.execute(
+        'INSERT INTO daily_sales_summary (day, units_sold, revenue, order_count) '
+        'SELECT DATE(timestamp), SUM(quantity), SUM(total_price), COUNT(id) FROM "order" '
+        'WHERE timestamp IS NOT NULL GROUP BY DATE(timestamp)'
+    )
+
+
+def downgrade():
+    op.drop_table('daily_sales_summary')
+    op.drop_table('category_sales_summary')
+    with op.batch_alter_table('product_sales_summary', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_sales_summary_units_sold')
+
+    op.drop_table('product_sales_summary')
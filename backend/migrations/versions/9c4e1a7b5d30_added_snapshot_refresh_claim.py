@@ -0,0 +1,26 @@
+"""Added snapshot refresh claim
+
+Revision ID: 9c4e1a7b5d30
+Revises: 7b2d4e6f8a13
+Create Date: 2026-10-18 19:06:41.203118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e1a7b5d30'
+down_revision = '7b2d4e6f8a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('recommendation_snapshot', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('refresh_claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('recommendation_snapshot', schema=None) as batch_op:
+        batch_op.drop_column('refresh_claimed_at')
@@ -0,0 +1,74 @@
+"""Added baskets and product pair counts
+
+Revision ID: d2a6c8e41f95
+Revises: b7e3d95c4a10
+Create Date: 2026-10-18 13:21:47.602381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6c8e41f95'
+down_revision = 'b7e3d95c4a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('basket',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('product_pair',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('other_product_id', sa.Integer(), nullable=False),
+    sa.Column('basket_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['other_product_id'], ['product.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'other_product_id')
+    )
+    with op.batch_alter_table('product_pair', schema=None) as batch_op:
+        batch_op.create_index('ix_product_pair_product_id_basket_count', ['product_id', 'basket_count'], unique=False)
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('basket_id', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_order_basket_id', ['basket_id'], unique=False)
+        batch_op.create_foreign_key('fk_order_basket_id_basket', 'basket', ['basket_id'], ['id'])
+
+    with op.batch_alter_table('product_sales_summary', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('basket_count', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('daily_sales_summary', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('basket_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Existing orders were each sold on their own, so each becomes a single-line basket
+    op.execute('INSERT INTO basket (id, user_id, timestamp) SELECT id, user_id, timestamp FROM "order"')
+    op.execute('UPDATE "order" SET basket_id = id')
+    op.execute('UPDATE product_sales_summary SET basket_count = order_count')
+    op.execute('UPDATE daily_sales_summary SET basket_count = order_count')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("SELECT setval('basket_id_seq', COALESCE((SELECT MAX(id) FROM basket), 0) + 1, false)")
+
+
+def downgrade():
+    with op.batch_alter_table('daily_sales_summary', schema=None) as batch_op:
+        batch_op.drop_column('basket_count')
+
+    with op.batch_alter_table('product_sales_summary', schema=None) as batch_op:
+        batch_op.drop_column('basket_count')
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_order_basket_id_basket', type_='foreignkey')
+        batch_op.drop_index('ix_order_basket_id')
+        batch_op.drop_column('basket_id')
+
+    with op.batch_alter_table('product_pair', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_pair_product_id_basket_count')
+
+    op.drop_table('product_pair')
+    op.drop_table('basket')
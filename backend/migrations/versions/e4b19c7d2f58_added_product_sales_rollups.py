@@ -0,0 +1,70 @@
+"""Added per-product daily and monthly sales rollups
+
+Revision ID: e4b19c7d2f58
+Revises: d2a6c8e41f95
+Create Date: 2026-10-18 15:02:13.418907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b19c7d2f58'
+down_revision = 'd2a6c8e41f95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_daily_sales',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+    with op.batch_alter_table('product_daily_sales', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_daily_sales_day'), ['day'], unique=False)
+
+    op.create_table('product_monthly_sales',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('calendar_month', sa.Integer(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'month')
+    )
+    with op.batch_alter_table('product_monthly_sales', schema=None) as batch_op:
+        batch_op.create_index('ix_product_monthly_sales_calendar_month', ['calendar_month'], unique=False)
+        batch_op.create_index('ix_product_monthly_sales_month', ['month'], unique=False)
+
+    # Backfill from the existing orders (old daily rows can be dropped with `flask prune-rollups`)
+    if op.get_bind().dialect.name == 'sqlite':
+        day, month, calendar_month = "date(timestamp)", "date(timestamp, 'start of month')", "CAST(strftime('%m', timestamp) AS INTEGER)"
+    else:
+        day, month, calendar_month = "CAST(timestamp AS DATE)", "CAST(date_trunc('month', timestamp) AS DATE)", "CAST(EXTRACT(MONTH FROM timestamp) AS INTEGER)"
+    op.execute(
+        f'INSERT INTO product_daily_sales (product_id, day, units_sold, revenue) '
+        f'SELECT product_id, {day}, SUM(quantity), SUM(total_price) FROM "order" '
+        f'WHERE timestamp IS NOT NULL GROUP BY product_id, {day}'
+    )
+    op.execute(
+        f'INSERT INTO product_monthly_sales (product_id, month, calendar_month, units_sold, revenue) '
+        f'SELECT product_id, {month}, {calendar_month}, SUM(quantity), SUM(total_price) FROM "order" '
+        f'WHERE timestamp IS NOT NULL GROUP BY product_id, {month}, {calendar_month}'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('product_monthly_sales', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_monthly_sales_month')
+        batch_op.drop_index('ix_product_monthly_sales_calendar_month')
+
+    op.drop_table('product_monthly_sales')
+    with op.batch_alter_table('product_daily_sales', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_daily_sales_day'))
+
+    op.drop_table('product_daily_sales')
@@ -0,0 +1,40 @@
+"""Added product search index
+
+Revision ID: f6d03a8b1c72
+Revises: e4b19c7d2f58
+Create Date: 2026-10-18 15:48:30.226154
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6d03a8b1c72'
+down_revision = 'e4b19c7d2f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Not part of the models, see search.py
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE product_search USING fts5("
+            "name, brand, prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute("INSERT INTO product_search (rowid, name, brand) SELECT id, name, brand FROM product")
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_product_search_document ON product "
+            "USING gin (to_tsvector('simple', name || ' ' || brand))"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE product_search")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX ix_product_search_document")
@@ -1,6 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 
+from passwords import password_hasher
+
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 
@@ -12,12 +14,16 @@ class User(db.Model):
     role = db.Column(db.String(50), default="staff")  # "admin" or "staff" (change as needed)
 
     def set_password(self, password):
-        """Hashes the password before storing it."""
-        self.password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+        """Hashes the password before storing it (in the password hashing pool)."""
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        """Checks if the provided password matches the stored hash."""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        """Checks if the provided password matches the stored hash (in the password hashing pool)."""
+        return password_hasher.check(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True when the stored hash predates the current BCRYPT_LOG_ROUNDS."""
+        return password_hasher.needs_rehash(self.password_hash)
 
     def is_admin(self):
         """Check if the user is an admin."""
@@ -40,11 +46,16 @@ class Product(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)  # Product name (e.g., "Galaxy S24 Ultra")
     brand = db.Column(db.String(50), nullable=False, default="Unknown")  # Brand (e.g., "Samsung")
-    category = db.Column(db.String(50), nullable=False)  # Category (e.g., "Phones")
+    category = db.Column(db.String(50), nullable=False, index=True)  # Category (e.g., "Phones")
     price = db.Column(db.Float, nullable=False)
     stock_quantity = db.Column(db.Integer, default=0)
     image = db.Column(db.String(255), nullable=True)
 
+    # A product is identified by its (name, brand, category) triple, see add_product
+    __table_args__ = (
+        db.Index("ix_product_name_brand_category", "name", "brand", "category", unique=True),
+    )
+
     def to_dict(self):
         """Return product details in dictionary format."""
         return {
@@ -63,18 +74,35 @@ class Product(db.Model):
 
 from datetime import datetime
 
-class Order(db.Model):
+class Basket(db.Model):
+    """One checkout: every Order line sold together shares a basket."""
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Basket {self.id}>"
+
+
+class Order(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey("product.id"), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     price_at_sale = db.Column(db.Float, nullable=False)  # Store price at sale time
     total_price = db.Column(db.Float, nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    basket_id = db.Column(db.Integer, db.ForeignKey("basket.id"), nullable=True, index=True)
+
+    # Also serves plain product_id lookups, since product_id is the leading column
+    __table_args__ = (
+        db.Index("ix_order_product_id_timestamp", "product_id", "timestamp"),
+    )
 
     # Relationships
     user = db.relationship("User", backref="orders", lazy=True)
     product = db.relationship("Product", backref="orders", lazy=True)
+    basket = db.relationship("Basket", backref="orders", lazy=True)
 
     def to_dict(self):
         return {
@@ -90,3 +118,93 @@ class Order(db.Model):
         }
 
 
+
+
+# Sales summary tables, kept up to date by summaries.record_sales()
+class ProductSalesSummary(db.Model):
+    product_id = db.Column(db.Integer, db.ForeignKey("product.id"), primary_key=True)
+    units_sold = db.Column(db.Integer, nullable=False, default=0, index=True)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    basket_count = db.Column(db.Integer, nullable=False, default=0)  # Baskets containing the product
+
+
+class CategorySalesSummary(db.Model):
+    category = db.Column(db.String(50), primary_key=True)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailySalesSummary(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    basket_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Per-product sales rollups by day and by month, for seasonality queries (ai/seasonality.py)
+class ProductDailySales(db.Model):
+    product_id = db.Column(db.Integer, db.ForeignKey("product.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True, index=True)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class ProductMonthlySales(db.Model):
+    product_id = db.Column(db.Integer, db.ForeignKey("product.id"), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)  # First day of the month
+    calendar_month = db.Column(db.Integer, nullable=False)  # 1-12, for month-of-year queries
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.Index("ix_product_monthly_sales_month", "month"),
+        db.Index("ix_product_monthly_sales_calendar_month", "calendar_month"),
+    )
+
+
+# How many baskets contained both products, stored in both directions, see ai/cooccurrence.py
+class ProductPair(db.Model):
+    product_id = db.Column(db.Integer, db.ForeignKey("product.id"), primary_key=True)
+    other_product_id = db.Column(db.Integer, db.ForeignKey("product.id"), primary_key=True)
+    basket_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Top-k partners of one product
+    __table_args__ = (
+        db.Index("ix_product_pair_product_id_basket_count", "product_id", "basket_count"),
+    )
+
+
+# Version counters for conditional GETs, bumped by the writes that change each namespace, see versions.py
+class CatalogVersion(db.Model):
+    name = db.Column(db.String(50), primary_key=True)  # "products", "stock", "sales" or "changes"
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Latest change of every product, for delta sync (GET /products/changes), see versions.py
+class ProductChange(db.Model):
+    product_id = db.Column(db.Integer, primary_key=True)  # No foreign key: deleted products keep their row
+    version = db.Column(db.Integer, nullable=False, index=True)  # The "changes" catalog version
+    operation = db.Column(db.String(10), nullable=False)  # "upsert" or "delete"
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Latest precomputed /api/ai/recommendations payload, see ai/snapshots.py
+class RecommendationSnapshot(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    payload = db.Column(db.Text, nullable=False)  # Serialized JSON
+    etag = db.Column(db.String(64), nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_order_id = db.Column(db.Integer, nullable=False, default=0)  # Newest order included
+    refresh_claimed_at = db.Column(db.DateTime, nullable=True)  # Set while a worker recomputes it
+
+
+# Logged-out JWTs, kept until they would have expired anyway, see revocation.py
+class RevokedToken(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # Pruned after this
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
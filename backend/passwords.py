@@ -0,0 +1,132 @@
+# passwords.py
+# bcrypt hashing in a separate process pool, so logins don't pin the request workers' CPU.
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+BCRYPT_MAX_BYTES = 72  # bcrypt ignores anything longer; bcrypt>=5 raises instead, so trim first
+
+
+def _encode(password):
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def hash_password(password, rounds):
+    """Runs in a pool process."""
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def verify_password(password_hash, password):
+    """Runs in a pool process."""
+    return bcrypt.checkpw(_encode(password), password_hash.encode("utf-8"))
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when no hashing slot frees up within PASSWORD_HASH_QUEUE_TIMEOUT."""
+
+
+class PasswordHasher:
+    """Bounded bcrypt worker pool with queue metrics.
+
+    At most PASSWORD_HASH_MAX_PENDING hashes are submitted at once (running
+    or queued for one of PASSWORD_HASH_WORKERS processes); further callers
+    wait up to PASSWORD_HASH_QUEUE_TIMEOUT seconds for a slot, then get
+    PasswordHasherBusy. With PASSWORD_HASH_WORKERS = 0, hashing runs inline.
+    Each server process has its own pool, so the host runs SERVER_WORKERS
+    times PASSWORD_HASH_WORKERS bcrypt processes.
+
+    Pool processes are spawned, and so import the __main__ module: scripts
+    that hash passwords need an `if __name__ == "__main__":` guard.
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.workers = 0
+        self.queue_timeout = None
+        self._pool = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._stats = {"waiting": 0, "pending": 0, "completed": 0, "rejected": 0, "wait_seconds": 0.0, "hash_seconds": 0.0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get("BCRYPT_LOG_ROUNDS", 12)
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS", 2)
+        self.queue_timeout = app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5)
+        self._slots = threading.BoundedSemaphore(app.config.get("PASSWORD_HASH_MAX_PENDING", 32))
+        app.extensions["password_hasher"] = self
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # Spawned rather than forked: the app process runs background threads
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def shutdown(self):
+        """Waits for hashes in flight and stops the pool processes (on server shutdown)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+
+    def _run(self, function, *args):
+        if not self.workers:
+            return function(*args)
+
+        self._count(waiting=1)
+        started = time.monotonic()
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        waited = time.monotonic() - started
+        if not acquired:
+            self._count(waiting=-1, rejected=1)
+            raise PasswordHasherBusy("Too many password checks in progress, try again shortly")
+
+        self._count(waiting=-1, pending=1, wait_seconds=waited)
+        try:
+            return self._get_pool().submit(function, *args).result()
+        finally:
+            self._slots.release()
+            self._count(pending=-1, completed=1, hash_seconds=time.monotonic() - started - waited)
+
+    def hash(self, password):
+        """Returns a bcrypt hash of `password` at the configured work factor."""
+        return self._run(hash_password, password, self.rounds)
+
+    def check(self, password_hash, password):
+        return self._run(verify_password, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when the hash was made with a different work factor than the configured one."""
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        """Returns queue depth and throughput counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        completed = stats.pop("completed")
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "waiting": stats["waiting"],  # Callers waiting for a slot
+            "pending": stats["pending"],  # Hashes queued or running in the pool
+            "completed": completed,
+            "rejected": stats["rejected"],
+            "avg_wait_ms": round(stats["wait_seconds"] * 1000 / completed, 1) if completed else 0.0,
+            "avg_hash_ms": round(stats["hash_seconds"] * 1000 / completed, 1) if completed else 0.0
+        }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,56 @@
+# permissions.py
+# Role checks for JWT-protected views, without a database lookup on every request.
+from functools import wraps
+
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+
+from cache import LRUBackend
+from models import User
+
+
+class UserStatusCache:
+    """Short-lived cache of each user's current role (None once the user no longer exists).
+
+    Lets role checks confirm that a token's user still exists, and still has
+    the role the token claims, with at most one query per user per TTL.
+    """
+
+    def __init__(self, max_entries=10000):
+        self._entries = LRUBackend(max_entries)
+
+    def current_role(self, user_id):
+        entry = self._entries.get(str(user_id))
+        if entry is None:
+            user = User.query.get(user_id)
+            entry = (user.role if user else None,)
+            self._entries.set(str(user_id), entry, current_app.config["AUTH_USER_CACHE_TTL"])
+        return entry[0]
+
+    def invalidate(self, user_id):
+        """Drops a user's cached role (after a role change) in this process."""
+        self._entries.delete(str(user_id))
+
+
+user_status = UserStatusCache()
+
+
+def role_required(*roles):
+    """Decorator requiring a valid access token whose signed `role` claim is one of `roles`.
+
+    The claim is trusted as signed; the user's existence and current role
+    come from `user_status`, so revoked or demoted users are refused within
+    AUTH_USER_CACHE_TTL seconds.
+    """
+    message = "Unauthorized: Admins only" if roles == ("admin",) else f"Unauthorized: requires role {' or '.join(roles)}"
+
+    def decorator(view):
+        @wraps(view)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            role = get_jwt().get("role")
+            if role not in roles or user_status.current_role(get_jwt_identity()) != role:
+                return jsonify({"error": message}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,122 @@
+# ratelimit.py
+# Token-bucket rate limiting for the auth endpoints, so password guessing can't burn bcrypt CPU.
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBuckets:
+    """Token buckets held in this process, least recently used dropped beyond `max_entries`.
+
+    Each server worker has its own, so a client spread over N workers gets N times the limit.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Takes one token; returns 0 if allowed, else the seconds until a token is available."""
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class SharedBuckets:
+    """Token buckets shared between workers, in Redis (updated atomically by a Lua script)."""
+
+    TAKE_SCRIPT = """
+    local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = tonumber(state[1]) or burst
+    local updated_at = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+    local retry_after = 0
+    if tokens >= 1 then tokens = tokens - 1 else retry_after = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    def __init__(self, client, prefix="inventory-ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(self.TAKE_SCRIPT)
+
+    def take(self, key, rate, burst):
+        return float(self._take(keys=[self.prefix + key], args=[rate, burst]))
+
+    def reset(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class RateLimiter:
+    """Named limits (burst size and refill rate per minute) checked against per-key buckets."""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.enabled = False
+        self.limits = {}  # name -> (tokens per second, burst)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config.get("RATE_LIMIT_ENABLED", True)
+        self.limits = {
+            "auth-ip": (config["AUTH_IP_PER_MINUTE"] / 60, config["AUTH_IP_BURST"]),
+            "auth-email": (config["AUTH_EMAIL_PER_MINUTE"] / 60, config["AUTH_EMAIL_BURST"]),
+        }
+
+        backend = config.get("RATE_LIMIT_BACKEND", "memory")
+        if backend == "memory":
+            self.backend = MemoryBuckets()
+        elif backend == "redis":
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("RATE_LIMIT_BACKEND='redis' requires the redis package")
+            self.backend = SharedBuckets(redis.Redis.from_url(config["RATE_LIMIT_URL"]))
+        else:
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+        app.extensions["rate_limiter"] = self
+
+    def hit(self, *checks):
+        """Takes a token from each (limit name, key) bucket.
+
+        Returns 0 when every bucket allowed the request, otherwise the seconds
+        to wait before retrying.
+        """
+        if not self.enabled or self.backend is None:
+            return 0
+        retry_after = 0
+        for name, key in checks:
+            rate, burst = self.limits[name]
+            retry_after = max(retry_after, self.backend.take(f"{name}:{key}", rate, burst))
+        return retry_after
+
+    def reset(self, name, key):
+        """Refills a bucket, e.g. the email bucket after a successful login."""
+        if self.backend is not None:
+            self.backend.reset(f"{name}:{key}")
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,90 @@
+# revocation.py
+# Shared JWT revocation (logout) store: a database table, mirrored in memory by every worker.
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from models import db, RevokedToken
+
+
+class RevocationStore:
+    """Revoked token ids, checked by flask-jwt-extended on every protected request.
+
+    Revocations are written to the revoked_token table, so they survive
+    restarts and reach every worker. Each worker keeps the unexpired ones in
+    a dict and pulls new rows at most every REVOCATION_SYNC_INTERVAL seconds,
+    so a check is a dict lookup rather than a query. Rows are deleted once
+    the token has expired, since an expired token is refused anyway.
+    """
+
+    def __init__(self):
+        self._revoked = {}  # jti -> expires_at
+        self._synced_at = None  # revoked_at high-water mark of the last sync
+        self._next_sync = 0.0
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app, jwt):
+        @jwt.token_in_blocklist_loader
+        def check_if_token_revoked(jwt_header, jwt_payload):
+            return self.is_revoked(jwt_payload["jti"])
+
+        app.extensions["revocation_store"] = self
+
+    def revoke(self, jti, exp=None):
+        """Revokes a token until its `exp` (a Unix timestamp, as found in the JWT payload)."""
+        expires_at = datetime.utcfromtimestamp(exp) if exp else datetime.utcnow() + timedelta(days=365)
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(RevokedToken).values(jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow()))
+        except IntegrityError:
+            pass  # Already revoked
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti):
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        return jti in self._revoked
+
+    def sync(self):
+        """Pulls revocations made by other workers and forgets expired ones."""
+        config = current_app.config
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_sync:
+                return  # Another thread just synced
+            started_at = datetime.utcnow()
+
+            # Own connection, so the check never touches the request's session
+            query = select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > started_at)
+            if self._synced_at is not None:
+                # Overlap the previous sync, so revocations committed late by a slow transaction are still seen
+                overlap = timedelta(seconds=config["REVOCATION_SYNC_OVERLAP"])
+                query = query.where(RevokedToken.revoked_at >= self._synced_at - overlap)
+            with db.engine.connect() as connection:
+                self._revoked.update(connection.execute(query).all())
+            self._synced_at = started_at
+
+            for jti, expires_at in list(self._revoked.items()):
+                if expires_at <= started_at:
+                    del self._revoked[jti]
+
+            if now >= self._next_prune:
+                self.prune()
+                self._next_prune = now + config["REVOCATION_PRUNE_INTERVAL"]
+            self._next_sync = now + config["REVOCATION_SYNC_INTERVAL"]
+
+    def prune(self):
+        """Deletes the rows of tokens that have expired; returns how many."""
+        with db.engine.begin() as connection:
+            return connection.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow())
+            ).rowcount
+
+
+revocation_store = RevocationStore()
@@ -1,4 +1,11 @@
-from flask import Blueprint, jsonify
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from werkzeug.http import is_resource_modified
+from ai.snapshots import get_snapshot
+from ai.cooccurrence import bought_together_with
+from ai.forecasting import forecaster
+from ai.seasonality import top_by_calendar_month, month_to_date_vs_last_year, trending_up
 from ai.recommender import (
     get_top_selling_products,
     get_restock_suggestions,
@@ -12,16 +19,189 @@ ai_bp = Blueprint('ai', __name__)
 # Route to get AI-powered recommendations
 @ai_bp.route('/recommendations', methods=['GET'])
 def recommendations():
-    top_sellers = get_top_selling_products()  # Get top-selling products
-    restock_suggestions = get_restock_suggestions()  # Get restock suggestions
-    frequently_bought_together = get_frequently_bought_together()  # Get frequently bought together items
-    category_trends = get_category_trends()  # Get category trends
-    time_based_recommendations = get_time_based_recommendations()  # Get time-based recommendations
-    
+    """Serves the latest precomputed recommendations snapshot (refreshed in the background)."""
+    snapshot = get_snapshot()
+
+    # Client already holds this snapshot
+    if not is_resource_modified(request.environ, etag=snapshot.etag, last_modified=snapshot.computed_at):
+        response = Response(status=304)
+    else:
+        response = Response(snapshot.payload, mimetype="application/json")
+
+    response.set_etag(snapshot.etag)
+    response.last_modified = snapshot.computed_at
+    response.cache_control.no_cache = True  # Clients may keep a copy but must revalidate it
+    return response
+
+
+# Route to get the products most often bought together with one product
+@ai_bp.route('/products/<int:product_id>/bought-together', methods=['GET'])
+def bought_together(product_id):
+    """Top-k basket partners of a product.
+
+    Query params:
+        k: number of products to return (default 5)
+        min_support: minimum share of all baskets containing both products (default 0)
+        min_lift: minimum lift over independent purchases (default 1)
+    """
+    k = request.args.get("k", 5, type=int)
+    min_support = request.args.get("min_support", 0.0, type=float)
+    min_lift = request.args.get("min_lift", 1.0, type=float)
+    if k < 1:
+        return jsonify({"error": "k must be a positive integer"}), 400
+
+    return jsonify({
+        "product_id": product_id,
+        "bought_together": bought_together_with(product_id, k=k, min_support=min_support, min_lift=min_lift)
+    }), 200
+
+
+# Route to get seasonal and trending products from the per-product sales rollups
+@ai_bp.route('/seasonality', methods=['GET'])
+def seasonality():
+    """Seasonal views of product sales.
+
+    Query params:
+        k: products per list (default 5)
+        days: length of the trending window in days (default 28, at most
+              half of ROLLUP_DAILY_RETENTION_DAYS, since it is compared with the window before)
+        category: only products in this category
+    """
+    k = request.args.get("k", 5, type=int)
+    days = request.args.get("days", 28, type=int)
+    max_days = current_app.config["ROLLUP_DAILY_RETENTION_DAYS"] // 2
+    if k < 1:
+        return jsonify({"error": "k must be a positive integer"}), 400
+    if days < 1:
+        return jsonify({"error": "days must be a positive integer"}), 400
+    if days > max_days:
+        return jsonify({"error": f"days must be at most {max_days}"}), 400
+
+    k = min(k, current_app.config["RECOMMENDATIONS_MAX_LIMIT"])
+    category = request.args.get("category")
+    return jsonify({
+        "top_by_month": top_by_calendar_month(k=k, category=category),
+        "month_to_date_vs_last_year": month_to_date_vs_last_year(k=k, category=category),
+        "trending_up": trending_up(k=k, days=days, category=category)
+    }), 200
+
+
+# Route to get velocity-based restock forecasts
+@ai_bp.route('/restock-forecast', methods=['GET'])
+def restock_forecast():
+    """Products ranked by days of stock cover at their recent sales velocity.
+
+    Query params:
+        limit: maximum number of products
+        category: only products in this category
+        all: "true" to include products that don't need restocking yet
+    """
+    try:
+        limit = limit_arg(None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    include_all = request.args.get("all", "false").lower() == "true"
+    return jsonify({
+        "restock_forecast": forecaster.forecast(
+            category=request.args.get("category"), include_all=include_all, limit=limit
+        )
+    }), 200
+
+
+# Per-section recommendation routes
+# Computed on demand with the given filters, so clients only pay for the section they need.
+def limit_arg(default):
+    """Reads `limit`, capped at RECOMMENDATIONS_MAX_LIMIT; raises ValueError if not positive."""
+    limit = request.args.get("limit", default, type=int)
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be a positive integer")
+    max_limit = current_app.config["RECOMMENDATIONS_MAX_LIMIT"]
+    return max_limit if limit is None else min(limit, max_limit)
+
+
+def window_args():
+    """Reads the optional inclusive `start`/`end` dates (YYYY-MM-DD) as a [start, end) datetime window."""
+    try:
+        start = request.args.get("start")
+        end = request.args.get("end")
+        start = datetime.strptime(start, "%Y-%m-%d") if start else None
+        end = datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1) if end else None
+    except ValueError:
+        raise ValueError("start and end must be dates in YYYY-MM-DD format")
+    return start, end
+
+
+@ai_bp.route('/top-sellers', methods=['GET'])
+def top_sellers():
+    """Query params: limit (default 5), category, start, end"""
+    try:
+        limit = limit_arg(5)
+        start, end = window_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    category = request.args.get("category")
+    return jsonify({"top_sellers": get_top_selling_products(limit=limit, category=category, start=start, end=end)}), 200
+
+
+@ai_bp.route('/restock-suggestions', methods=['GET'])
+def restock_suggestions():
+    """Query params: threshold (stock below which to restock, default 10), limit, category"""
+    try:
+        limit = limit_arg(None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    threshold = request.args.get("threshold", 10, type=int)
+    category = request.args.get("category")
+    return jsonify({
+        "restock_suggestions": get_restock_suggestions(threshold=threshold, limit=limit, category=category)
+    }), 200
+
+
+@ai_bp.route('/frequently-bought-together', methods=['GET'])
+def frequently_bought_together():
+    """Query params: limit (default 10), min_support, min_lift"""
+    try:
+        limit = limit_arg(10)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    min_support = request.args.get("min_support", 0.0, type=float)
+    min_lift = request.args.get("min_lift", 1.0, type=float)
+    return jsonify({
+        "frequently_bought_together": get_frequently_bought_together(
+            limit=limit, min_support=min_support, min_lift=min_lift
+        )
+    }), 200
+
+
+@ai_bp.route('/category-trends', methods=['GET'])
+def category_trends():
+    """Query params: limit, start, end"""
+    try:
+        limit = limit_arg(None)
+        start, end = window_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"category_trends": get_category_trends(limit=limit, start=start, end=end)}), 200
+
+
+@ai_bp.route('/seasonal', methods=['GET'])
+def seasonal():
+    """Query params: month (1-12), limit, category"""
+    try:
+        limit = limit_arg(None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    month = request.args.get("month", type=int)
+    if month is not None and not 1 <= month <= 12:
+        return jsonify({"error": "month must be between 1 and 12"}), 400
+
+    category = request.args.get("category")
     return jsonify({
-        "top_sellers": top_sellers,
-        "restock_suggestions": restock_suggestions,
-        "frequently_bought_together": frequently_bought_together,
-        "category_trends": category_trends,
-        "time_based_recommendations": time_based_recommendations
-    })
+        "time_based_recommendations": get_time_based_recommendations(month=month, limit=limit, category=category)
+    }), 200
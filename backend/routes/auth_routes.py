@@ -1,19 +1,33 @@
+import math
+
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import (
     JWTManager, create_access_token, create_refresh_token,
-    jwt_required, get_jwt_identity, get_jwt
+    jwt_required, get_jwt_identity, get_jwt, decode_token
 )
 from flask_jwt_extended.exceptions import NoAuthorizationError
 from jwt.exceptions import ExpiredSignatureError  # Fix Import
 
 
 from models import db, User
+from permissions import role_required, user_status
+from revocation import revocation_store
+from passwords import PasswordHasherBusy, password_hasher
+from ratelimit import rate_limiter
 from datetime import timedelta
 
 auth = Blueprint("auth", __name__)
 
-# Store blacklisted tokens (for logout functionality)
-blacklisted_tokens = set()
+def throttle(email):
+    """Takes an attempt from the client IP's and the email's buckets; returns a 429 response once either is empty."""
+    checks = [("auth-ip", request.remote_addr)]
+    if isinstance(email, str) and email.strip():
+        checks.append(("auth-email", email.strip().lower()))
+    retry_after = rate_limiter.hit(*checks)
+    if retry_after:
+        return jsonify({"error": "Too many attempts, try again later"}), 429, {"Retry-After": str(math.ceil(retry_after))}
+    return None
+
 
 ### LOGIN ROUTE
 @auth.route("/login", methods=["POST"])
@@ -23,10 +37,25 @@ def login():
     email = data.get("email")
     password = data.get("password")
 
+    # Before the user lookup and bcrypt check, so throttled guesses cost no hashing
+    throttled = throttle(email)
+    if throttled:
+        return throttled
+
     user = User.query.filter_by(email=email).first()
 
-    if not user or not user.check_password(password):
-        return jsonify({"error": "Invalid email or password"}), 401
+    try:
+        if not user or not user.check_password(password):
+            return jsonify({"error": "Invalid email or password"}), 401
+
+        rate_limiter.reset("auth-email", email.strip().lower())  # Earlier typos don't count against the user
+
+        # Upgrade the hash to the current work factor while we have the password
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
 
     # Create JWT tokens    
     access_token = create_access_token(
@@ -56,6 +85,10 @@ def forgot_password():
     data = request.get_json()
     email = data.get("email")
 
+    throttled = throttle(email)
+    if throttled:
+        return throttled
+
     if not email:
         return jsonify({"message": "Email is required"}), 400
 
@@ -78,26 +111,39 @@ def refresh():
     return jsonify({"access_token": new_access_token}), 200
 
 
-### LOGOUT ROUTE (BLACKLIST TOKEN)
+### LOGOUT ROUTE (REVOKE TOKEN)
 @auth.route("/logout", methods=["POST"])
 @jwt_required()
 def logout():
-    """Blacklist the token to log the user out."""
-    jti = get_jwt()["jti"]  # Get token identifier
-    blacklisted_tokens.add(jti)  # Store it in the blacklist
+    """Revoke the token to log the user out (on every worker, until it expires).
+
+    Send the refresh token as {"refresh_token": ...} so it can't mint new access tokens either.
+    """
+    token = get_jwt()
+    revoked = [token]
+
+    refresh_token = (request.get_json(silent=True) or {}).get("refresh_token")
+    if refresh_token:
+        try:
+            refresh_payload = decode_token(refresh_token)
+        except ExpiredSignatureError:
+            refresh_payload = None  # Already refused
+        except Exception:
+            return jsonify({"error": "Invalid refresh token"}), 400
+        if refresh_payload is not None:
+            if refresh_payload.get("type") != "refresh" or refresh_payload.get("sub") != token.get("sub"):
+                return jsonify({"error": "Invalid refresh token"}), 400
+            revoked.append(refresh_payload)
+
+    for payload in revoked:
+        revocation_store.revoke(payload["jti"], payload.get("exp"))
     return jsonify({"message": "Successfully logged out!"}), 200
 
 ### ADD USER ROUTE (ADMIN-ONLY)
 @auth.route("/add-user", methods=["POST"])
-@jwt_required()
+@role_required("admin")
 def add_user():
     """Only admins can create new users."""
-
-    user_role = get_jwt().get("role")  # Get role from claims
-
-    if user_role != "admin":
-        return jsonify({"error": "Unauthorized"}), 403  # Forbidden
-
     data = request.get_json()
     username = data.get("username")
     email = data.get("email")
@@ -111,7 +157,10 @@ def add_user():
         return jsonify({"error": "Email already exists"}), 400
 
     new_user = User(username=username, email=email, role=role)
-    new_user.set_password(password)  # Hash password before saving
+    try:
+        new_user.set_password(password)  # Hash password before saving
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     db.session.add(new_user)
     db.session.commit()
 
@@ -121,12 +170,8 @@ def add_user():
     }), 201
 
 @auth.route("/update_role/<int:user_id>", methods=["PUT"])
-@jwt_required()
+@role_required("admin")
 def update_role(user_id):
-    current_user = get_jwt_identity()
-    if current_user["role"] != "admin":
-        return jsonify({"error": "Unauthorized"}), 403
-
     data = request.get_json()
     new_role = data.get("role")
 
@@ -139,6 +184,7 @@ def update_role(user_id):
 
     user.role = new_role
     db.session.commit()
+    user_status.invalidate(user.id)  # Tokens claiming the old role stop working here at once
 
     return jsonify({"message": f"User {user.username} role updated to {new_role}."})
 
@@ -152,6 +198,13 @@ def protected():
     user_role = get_jwt().get("role")
     return jsonify({"message": "Access granted", "user": {"id": user_id, "role": user_role}})
 
+### PASSWORD HASHING POOL METRICS (ADMIN-ONLY)
+@auth.route("/password-hasher/stats", methods=["GET"])
+@role_required("admin")
+def password_hasher_stats():
+    """Returns the bcrypt pool's queue depth and timing counters."""
+    return jsonify(password_hasher.stats()), 200
+
 ### ERROR HANDLING FOR JWT
 @auth.app_errorhandler(ExpiredSignatureError)
 def handle_expired_token(e):
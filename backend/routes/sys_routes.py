@@ -1,7 +1,18 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
-from models import db, Product, User, Order
-from sqlalchemy import func
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import db, Product, User, Order, Basket, CategorySalesSummary, DailySalesSummary, ProductChange, CatalogVersion
+from summaries import record_sales, move_product_category
+from cache import cache
+from versions import conditional, bump_versions, record_product_changes
+from permissions import role_required
+from search import search_products, index_products, unindex_products, SEARCH_SORTS
+from sqlalchemy import func, update, insert, bindparam, tuple_, or_
+from sqlalchemy.exc import IntegrityError
 
 # Create a Blueprint for the routes
 routes = Blueprint("routes", __name__)
@@ -12,9 +23,18 @@ def index():
     return {"message": "API is running"}, 200
 
 
+# Response cache hit/miss counters (for monitoring)
+@routes.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    """Returns the response cache's hit/miss counters."""
+    return jsonify(cache.stats()), 200
+
+
     
 # Total Product Count (Single Number)
 @routes.route("/products/count-total", methods=["GET"])
+@conditional("products")
+@cache.cached("products")
 def get_total_product_count():
     """Returns the total number of products."""
     try:
@@ -26,6 +46,8 @@ def get_total_product_count():
 
 # Category-Wise Product Count
 @routes.route("/products/count-by-category", methods=["GET"])
+@conditional("products")
+@cache.cached("products")
 def get_product_count_by_category():
     """Returns the count of products grouped by category."""
     try:
@@ -45,6 +67,8 @@ def get_product_count_by_category():
     
 # Fetch All Products (Public Access)
 @routes.route("/products", methods=["GET"])
+@conditional("products", "stock")
+@cache.cached("products", "stock")
 def fetch_products():
     """Fetches all products from the database (accessible to all users)."""
 
@@ -59,23 +83,127 @@ def fetch_products():
     except Exception as e:
         return jsonify({"error": f"Failed to fetch products: {str(e)}"}), 500
 
-# Add a New Product (Requires Admin)
-@routes.route('/add_product', methods=['POST'])
-@jwt_required()
-def add_product():
-    """Adds a new product or updates stock if it already exists."""
+# Catalog Search (Public Access)
+@routes.route("/products/search", methods=["GET"])
+@conditional("products", "stock")
+@cache.cached("products", "stock")
+def search_catalog():
+    """Searches products by name/brand word prefixes, with filters, sorting and pagination.
+
+    Query params:
+        q: search words, each matched as a prefix (e.g. "coc col" finds "Coca Cola")
+        category, min_price, max_price, in_stock (true/false): filters
+        sort: relevance (default when searching), name, -name, price, -price, stock, -stock
+        limit: page size (defaults to SEARCH_PAGE_SIZE, capped at SEARCH_PAGE_MAX_SIZE)
+        offset: number of results to skip
+    """
+    limit = request.args.get("limit", current_app.config["SEARCH_PAGE_SIZE"], type=int)
+    offset = request.args.get("offset", 0, type=int)
+    min_price = request.args.get("min_price", None, type=float)
+    max_price = request.args.get("max_price", None, type=float)
+    in_stock = request.args.get("in_stock", "false").lower() == "true"
+    sort = request.args.get("sort")
+
+    if limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    if offset < 0:
+        return jsonify({"error": "offset cannot be negative"}), 400
+    if sort is not None and sort != "relevance" and sort not in SEARCH_SORTS:
+        return jsonify({"error": f"sort must be one of: relevance, {', '.join(SEARCH_SORTS)}"}), 400
+    limit = min(limit, current_app.config["SEARCH_PAGE_MAX_SIZE"])
+
     try:
-        verify_jwt_in_request()
-        current_user = get_jwt_identity()
-        user_role = get_jwt().get("role")
+        products, total = search_products(
+            q=request.args.get("q"),
+            category=request.args.get("category"),
+            min_price=min_price,
+            max_price=max_price,
+            in_stock=in_stock,
+            sort=sort,
+            limit=limit,
+            offset=offset
+        )
+        return jsonify({
+            "products": [product.to_dict() for product in products],
+            "total": total,
+            "limit": limit,
+            "offset": offset
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to search products: {str(e)}"}), 500
+
+# Catalog Delta Sync (Public Access)
+@routes.route("/products/changes", methods=["GET"])
+@conditional("changes")
+def get_product_changes():
+    """Returns the products changed or deleted since a catalog version, oldest change first.
+
+    Query params:
+        since: the `version` returned by the previous sync (0 or omitted for a full sync)
+        limit: page size (defaults to SEARCH_PAGE_MAX_SIZE); a page always ends on a
+            whole version, so it can run over when one write touched many products
+
+    Clients store the returned `version` and pass it as `since` next time,
+    repeating while `has_more` is true.
+    """
+    since = request.args.get("since", 0, type=int)
+    limit = request.args.get("limit", current_app.config["SEARCH_PAGE_MAX_SIZE"], type=int)
+    if since < 0:
+        return jsonify({"error": "since cannot be negative"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    try:
+        current = db.session.query(CatalogVersion.version).filter(CatalogVersion.name == "changes").scalar() or 0
+        if since > current:
+            return jsonify({"error": "Unknown version, a full sync (since=0) is needed", "version": current}), 410
+
+        query = (
+            db.session.query(ProductChange, Product)
+            .outerjoin(Product, Product.id == ProductChange.product_id)
+            .order_by(ProductChange.version, ProductChange.product_id)
+        )
+        rows = query.filter(ProductChange.version > since).limit(limit + 1).all()
+
+        has_more = len(rows) > limit
+        if has_more:
+            # Finish the last version on the page so the cursor can move past it
+            rows = rows[:limit]
+            last = rows[-1][0]
+            rows += query.filter(
+                ProductChange.version == last.version, ProductChange.product_id > last.product_id
+            ).all()
+            has_more = db.session.query(
+                db.session.query(ProductChange).filter(ProductChange.version > last.version).exists()
+            ).scalar()
+
+        products = []
+        deleted = []
+        for change, product in rows:
+            if change.operation == "delete" or product is None:
+                deleted.append(change.product_id)
+            else:
+                products.append(product.to_dict())
+
+        return jsonify({
+            "products": products,
+            "deleted": deleted,
+            "version": rows[-1][0].version if has_more else current,
+            "has_more": has_more
+        }), 200
+
     except Exception as e:
-        return jsonify({"error": f"JWT Error: {str(e)}"}), 401
+        return jsonify({"error": f"Failed to fetch product changes: {str(e)}"}), 500
 
-    # Ensure only admin users can add/update products
-    user = User.query.get(current_user)
-    if not user or user_role != "admin":
-        return jsonify({"error": "Unauthorized: Admins only"}), 403
+# Add a New Product (Requires Admin)
+DUPLICATE_PRODUCT_ERROR = "A product with this name, brand and category already exists"
 
+
+@routes.route('/add_product', methods=['POST'])
+@role_required("admin")
+def add_product():
+    """Adds a new product or updates stock if it already exists."""
     # Parse request data
     try:
         data = request.get_json()
@@ -96,7 +224,11 @@ def add_product():
         if existing_product:
             # If product exists, increase stock quantity
             existing_product.stock_quantity += stock_quantity
+            db.session.flush()
+            record_product_changes([existing_product.id])
+            bump_versions("stock")
             db.session.commit()
+            cache.invalidate("stock")
             return jsonify({"message": "Stock updated successfully!", "product": existing_product.to_dict()}), 200
         else:
             # If not found, add a new product
@@ -108,41 +240,180 @@ def add_product():
                 stock_quantity=stock_quantity,
                 image=image  # Can be None
             )
-            db.session.add(new_product)
-            db.session.commit()
+            try:
+                db.session.add(new_product)
+                db.session.flush()
+                index_products([new_product.id])
+                record_product_changes([new_product.id])
+                bump_versions("products")
+                db.session.commit()
+            except IntegrityError:
+                # Another request added the same product meanwhile (unique name, brand, category)
+                db.session.rollback()
+                return jsonify({"error": DUPLICATE_PRODUCT_ERROR}), 409
+            cache.invalidate("products")
             return jsonify({"message": "Product added successfully!", "product": new_product.to_dict()}), 201
 
     except Exception as e:
         return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
 
 
-# delete a Product (Requires Admin)
-@routes.route('/products/<int:product_id>', methods=['DELETE'])
-@jwt_required()  # Require authentication
-def delete_product(product_id):
-    """Allows an admin to delete a product."""
-    
-    #  Debug request headers
-    print(" Request Headers:", request.headers)
+# Bulk Product Import / Upsert (Requires Admin)
+def parse_import_row(raw):
+    """Validates one import row; returns (key, fields) or raises ValueError."""
+    if not isinstance(raw, dict):
+        raise ValueError("Row must be an object")
+
+    name = (raw.get("name") or "").strip()
+    brand = (raw.get("brand") or "").strip()
+    category = (raw.get("category") or "").strip()
+    price = raw.get("price")
+    if not name or not brand or not category or price in (None, ""):
+        raise ValueError("Missing required fields")
+
+    price = float(price)
+    if price < 0:
+        raise ValueError("Price cannot be negative")
+
+    stock_quantity = int(raw.get("stock_quantity") or 0)
+    if stock_quantity < 0:
+        raise ValueError("Stock quantity cannot be negative")
+
+    return (name, brand, category), {
+        "name": name,
+        "brand": brand,
+        "category": category,
+        "price": price,
+        "stock_quantity": stock_quantity,
+        "image": raw.get("image") or None
+    }
+
+
+def upsert_products_chunk(chunk, results):
+    """Upserts one chunk of (row_number, raw_row) pairs and commits it.
+
+    Existing products (same name, brand, category) get their stock increased,
+    new ones are inserted; one result per row is appended to `results`.
+    """
+    parsed = []
+    for row_number, raw in chunk:
+        try:
+            key, fields = parse_import_row(raw)
+            parsed.append((row_number, key, fields))
+        except (TypeError, ValueError) as e:
+            results.append({"row": row_number, "status": "error", "error": str(e)})
+
+    if not parsed:
+        return
+
+    # Resolve every key in the chunk with one set-based query
+    keys = {key for _, key, _ in parsed}
+    existing = {
+        (name, brand, category): product_id
+        for product_id, name, brand, category in db.session.query(
+            Product.id, Product.name, Product.brand, Product.category
+        ).filter(tuple_(Product.name, Product.brand, Product.category).in_(keys))
+    }
+
+    increments = {}  # product_id -> stock to add
+    new_products = {}  # key -> fields, with stock summed over duplicate rows
+    row_keys = []
+    for row_number, key, fields in parsed:
+        if key in existing:
+            increments[existing[key]] = increments.get(existing[key], 0) + fields["stock_quantity"]
+            row_keys.append((row_number, key, "updated"))
+        elif key in new_products:
+            new_products[key]["stock_quantity"] += fields["stock_quantity"]
+            row_keys.append((row_number, key, "updated"))
+        else:
+            new_products[key] = fields
+            row_keys.append((row_number, key, "created"))
 
     try:
-        verify_jwt_in_request()
-        current_user = get_jwt_identity()
-        user_role = get_jwt().get("role")
+        if increments:
+            product_table = Product.__table__
+            db.session.execute(
+                update(product_table)
+                .where(product_table.c.id == bindparam("b_id"))
+                .values(stock_quantity=product_table.c.stock_quantity + bindparam("b_quantity")),
+                [{"b_id": product_id, "b_quantity": quantity} for product_id, quantity in increments.items()]
+            )
+        if new_products:
+            new_ids = db.session.scalars(
+                insert(Product).returning(Product.id, sort_by_parameter_order=True),
+                list(new_products.values())
+            ).all()
+            existing.update(zip(new_products, new_ids))
+            index_products(new_ids)
+        record_product_changes(existing[key] for _, key, _ in row_keys)
+        bump_versions("products", "stock")
+        db.session.commit()
+        cache.invalidate("products", "stock")
     except Exception as e:
-        return jsonify({"error": f"JWT Error: {str(e)}"}), 401  # Token error
+        db.session.rollback()
+        results.extend({"row": row_number, "status": "error", "error": str(e)} for row_number, _, _ in row_keys)
+        return
+
+    results.extend({"row": row_number, "status": status, "id": existing[key]} for row_number, key, status in row_keys)
+
+
+@routes.route('/products/import', methods=['POST'])
+@role_required("admin")
+def import_products():
+    """Bulk-adds products, or increases stock for ones that already exist.
+
+    Accepts a JSON array of products (same fields as /add_product) or a CSV
+    upload in the `file` form field with a header row. Rows are committed in
+    chunks of `chunk_size` (query param, defaults to IMPORT_CHUNK_SIZE).
+    """
+    chunk_size = request.args.get("chunk_size", current_app.config["IMPORT_CHUNK_SIZE"], type=int)
+    if chunk_size < 1:
+        return jsonify({"error": "chunk_size must be a positive integer"}), 400
+
+    if "file" in request.files:
+        try:
+            text = request.files["file"].read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            return jsonify({"error": "CSV file must be UTF-8 encoded"}), 400
+        rows = csv.DictReader(io.StringIO(text))
+    else:
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            return jsonify({"error": "Expected a JSON array of products or a CSV file upload"}), 400
+
+    results = []
+    chunk = []
+    for row_number, raw in enumerate(rows, start=1):
+        chunk.append((row_number, raw))
+        if len(chunk) == chunk_size:
+            upsert_products_chunk(chunk, results)
+            chunk = []
+    if chunk:
+        upsert_products_chunk(chunk, results)
+
+    results.sort(key=lambda result: result["row"])
+    summary = {status: 0 for status in ("created", "updated", "error")}
+    for result in results:
+        summary[result["status"]] += 1
+
+    return jsonify({"message": "Import finished", "summary": summary, "results": results}), 200
 
-    # Ensure only admins can delete products
-    user = User.query.get(current_user)
-    if not user or user_role != "admin":
-        return jsonify({"error": "Unauthorized: Admins only"}), 403
 
+# delete a Product (Requires Admin)
+@routes.route('/products/<int:product_id>', methods=['DELETE'])
+@role_required("admin")
+def delete_product(product_id):
+    """Allows an admin to delete a product."""
     product = Product.query.get(product_id)
     if not product:
         return jsonify({"error": "Product not found"}), 404
 
     db.session.delete(product)
+    unindex_products([product_id])
+    record_product_changes([product_id], operation="delete")
+    bump_versions("products")
     db.session.commit()
+    cache.invalidate("products")
 
     return jsonify({"message": "Product deleted successfully"}), 200
 
@@ -150,25 +421,14 @@ def delete_product(product_id):
 
 # Edit a Product (Requires Admin)
 @routes.route('/products/<int:product_id>', methods=['PUT'])
-@jwt_required()  # Require JWT authentication
+@role_required("admin")
 def update_product(product_id):
     """Allows an admin to update a product's details."""
-    try:
-        verify_jwt_in_request()
-        current_user = get_jwt_identity()
-        user_role = get_jwt().get("role")
-    except Exception as e:
-        return jsonify({"error": f"JWT Error: {str(e)}"}), 401
-
-    # Ensure only admin users can edit products
-    user = User.query.get(current_user)
-    if not user or user_role != "admin":
-        return jsonify({"error": "Unauthorized: Admins only"}), 403
-
     # Get product
     product = Product.query.get(product_id)
     if not product:
         return jsonify({"error": "Product not found"}), 404
+    old_category = product.category
 
     # Parse request data
     try:
@@ -176,18 +436,21 @@ def update_product(product_id):
     except Exception as e:
         return jsonify({"error": f"Invalid JSON format: {str(e)}"}), 400
 
-    # Validate and update product fields
-    product.name = data.get("name", product.name)
-    if isinstance(product.name, str): 
-        product.name = product.name.strip()
-
-    product.category = data.get("category", product.category)
-    if isinstance(product.category, str): 
-        product.category = product.category.strip()
+    # (name, brand, category) is unique, so refuse to rename onto another product
+    name, brand, category = (
+        value.strip() if isinstance(value, str) else value
+        for value in (data.get("name", product.name), data.get("brand", product.brand), data.get("category", product.category))
+    )
+    duplicate = Product.query.filter(
+        Product.name == name, Product.brand == brand, Product.category == category, Product.id != product.id
+    ).first()
+    if duplicate:
+        return jsonify({"error": DUPLICATE_PRODUCT_ERROR}), 409
 
-    product.brand = data.get("brand", product.brand)
-    if isinstance(product.brand, str): 
-        product.brand = product.brand.strip()
+    # Validate and update product fields
+    product.name = name
+    product.category = category
+    product.brand = brand
 
     # Ensure price is valid
     try:
@@ -208,53 +471,256 @@ def update_product(product_id):
     # Allow empty image field (optional)
     product.image = data.get("image", product.image)
 
-    # Commit the changes
-    db.session.commit()
+    try:
+        # Keep the category sales totals in line with the product's new category
+        move_product_category(product.id, old_category, product.category)
+
+        # Name and brand are what the search index covers
+        db.session.flush()
+        index_products([product.id])
+        record_product_changes([product.id])
+
+        # Commit the changes
+        bump_versions("products", "sales")
+        db.session.commit()
+    except IntegrityError:
+        # Another request took the same name, brand and category meanwhile
+        db.session.rollback()
+        return jsonify({"error": DUPLICATE_PRODUCT_ERROR}), 409
+    cache.invalidate("products", "sales")  # A category change moves sales totals
 
     return jsonify({"message": " Product updated successfully!", "product": product.to_dict()}), 200
 
 
 #sales API Route
+def sales_query():
+    """Builds a single joined query returning the columns needed to serialize a sale."""
+    return (
+        db.session.query(
+            Order.id,
+            Order.timestamp,
+            Order.user_id,
+            Order.quantity,
+            Order.price_at_sale,
+            Order.total_price,
+            User.username,
+            User.email,
+            User.role,
+            Product.name,
+            Product.brand,
+            Product.category,
+        )
+        .outerjoin(User, User.id == Order.user_id)
+        .outerjoin(Product, Product.id == Order.product_id)
+    )
+
+
+def serialize_sale(row):
+    """Converts a row from `sales_query()` into the sale dictionary format."""
+    return {
+        "id": row.id,
+        "date": row.timestamp.strftime("%Y-%m-%d %H:%M:%S") if row.timestamp else "Unknown",
+        "user": {"id": row.user_id, "username": row.username, "email": row.email, "role": row.role}
+        if row.username is not None else {"id": None, "username": "Unknown"},  # Prevent crash if user is missing
+        "product": row.name if row.name is not None else "Unknown",  # Prevent crash if product is missing
+        "brand": row.brand if row.name is not None else "Unknown",
+        "category": row.category if row.name is not None else "Unknown",
+        "price": row.price_at_sale,  # Use stored price
+        "quantity": row.quantity,
+        "total_price": row.total_price
+    }
+
+
 @routes.route('/sales', methods=['GET'])
 def get_sales():
-    """Fetch all sales transactions from the Order table."""
-    orders = Order.query.all()  # Fetch all orders from the database
-
-    sales_list = []
-    for order in orders:
-        sales_list.append({
-            "id": order.id,
-            "date": order.timestamp.strftime("%Y-%m-%d %H:%M:%S") if order.timestamp else "Unknown",  
-            "user": order.user.to_dict() if order.user else {"id": None, "username": "Unknown"},  # Prevent crash if user is missing
-            "product": order.product.name if order.product else "Unknown",  # Prevent crash if product is missing
-            "brand": order.product.brand if order.product else "Unknown",
-            "category": order.product.category if order.product else "Unknown",
-            "price": order.product.price if order.product else 0.0,  # Default price
-            "quantity": order.quantity,
-            "total_price": order.total_price
-        })
-
-    return jsonify({"sales": sales_list}), 200
+    """Fetch one page of sales transactions, newest first.
+
+    Query params:
+        limit: page size (defaults to SALES_PAGE_SIZE, capped at SALES_PAGE_MAX_SIZE)
+        after: the `next_cursor` value returned by the previous page
+        date: optional day, YYYY-MM-DD
+        q: optional text matched against the product name or brand
+        category: optional product category
+    """
+    limit = request.args.get("limit", current_app.config["SALES_PAGE_SIZE"], type=int)
+    after = request.args.get("after", None, type=int)
+    q = request.args.get("q", "").strip()
+    category = request.args.get("category")
+
+    if limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    limit = min(limit, current_app.config["SALES_PAGE_MAX_SIZE"])
+
+    try:
+        day = request.args.get("date")
+        day = datetime.strptime(day, "%Y-%m-%d") if day else None
+    except ValueError:
+        return jsonify({"error": "date must be in YYYY-MM-DD format"}), 400
+
+    try:
+        # Keyset pagination on the primary key: ids grow with insertion time,
+        # so `id < cursor` walks the history newest-first using the PK index.
+        query = sales_query()
+        if after is not None:
+            query = query.filter(Order.id < after)
+        if day:
+            query = query.filter(Order.timestamp >= day, Order.timestamp < day + timedelta(days=1))
+        if q:
+            query = query.filter(or_(Product.name.ilike(f"%{q}%"), Product.brand.ilike(f"%{q}%")))
+        if category:
+            query = query.filter(Product.category == category)
+        rows = query.order_by(Order.id.desc()).limit(limit + 1).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = rows[-1].id if has_more else None
+
+        return jsonify({
+            "sales": [serialize_sale(row) for row in rows],
+            "next_cursor": next_cursor,
+            "limit": limit
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch sales: {str(e)}"}), 500
+
+#Time-bucketed sales series
+SERIES_INTERVALS = ("day", "week", "month")
+SERIES_GROUPS = {"category": Product.category, "product": Product.name}
+
+
+def time_bucket(column, interval):
+    """SQL expression labelling a timestamp with the start date (YYYY-MM-DD) of its day/week/month."""
+    if db.engine.dialect.name == "sqlite":
+        if interval == "day":
+            return func.date(column)
+        if interval == "week":
+            return func.date(column, "weekday 0", "-6 days")  # Monday of the week
+        return func.strftime("%Y-%m-01", column)
+    return func.to_char(func.date_trunc(interval, column), "YYYY-MM-DD")
+
+
+@routes.route('/sales/series', methods=['GET'])
+def get_sales_series():
+    """Returns revenue and units sold per day/week/month.
+
+    Query params:
+        interval: "day" (default), "week" or "month"
+        start, end: optional inclusive date range, YYYY-MM-DD
+        group_by: optional "category" or "product", to split each bucket
+    """
+    interval = request.args.get("interval", "day")
+    group_by = request.args.get("group_by")
+    if interval not in SERIES_INTERVALS:
+        return jsonify({"error": f"interval must be one of {', '.join(SERIES_INTERVALS)}"}), 400
+    if group_by is not None and group_by not in SERIES_GROUPS:
+        return jsonify({"error": f"group_by must be one of {', '.join(SERIES_GROUPS)}"}), 400
+
+    try:
+        start = request.args.get("start")
+        end = request.args.get("end")
+        start = datetime.strptime(start, "%Y-%m-%d") if start else None
+        end = datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1) if end else None
+    except ValueError:
+        return jsonify({"error": "start and end must be dates in YYYY-MM-DD format"}), 400
+
+    try:
+        bucket = time_bucket(Order.timestamp, interval).label("bucket")
+        columns = [bucket, func.sum(Order.total_price), func.sum(Order.quantity)]
+        if group_by:
+            columns.append(SERIES_GROUPS[group_by])
+
+        # Range filter on the indexed timestamp column, grouping done in SQL
+        query = db.session.query(*columns).filter(Order.timestamp.isnot(None))
+        if group_by:
+            query = query.join(Product, Product.id == Order.product_id)
+        if start:
+            query = query.filter(Order.timestamp >= start)
+        if end:
+            query = query.filter(Order.timestamp < end)
+
+        query = query.group_by(*([bucket] + columns[3:])).order_by(bucket)
+
+        series = []
+        for row in query.all():
+            point = {"date": row[0], "revenue": row[1], "units": row[2]}
+            if group_by:
+                point[group_by] = row[3]
+            series.append(point)
+
+        return jsonify({"interval": interval, "group_by": group_by, "series": series}), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch sales series: {str(e)}"}), 500
+
+
+#Streaming sales export
+@routes.route('/sales/export', methods=['GET'])
+def export_sales():
+    """Streams the full sales history, oldest first.
+
+    Query params:
+        format: "ndjson" (one sale per line, default) or "json" (a single JSON array)
+    """
+    export_format = request.args.get("format", "ndjson").lower()
+    if export_format not in ("ndjson", "json"):
+        return jsonify({"error": "format must be 'ndjson' or 'json'"}), 400
+
+    batch_size = current_app.config["SALES_EXPORT_BATCH_SIZE"]
+
+    def generate():
+        # yield_per fetches rows from the cursor in batches instead of buffering them all
+        rows = sales_query().order_by(Order.id).execution_options(yield_per=batch_size)
+
+        if export_format == "ndjson":
+            for row in rows:
+                yield json.dumps(serialize_sale(row)) + "\n"
+            return
+
+        yield "["
+        first = True
+        for row in rows:
+            yield ("" if first else ",") + json.dumps(serialize_sale(row))
+            first = False
+        yield "]"
+
+    mimetype = "application/x-ndjson" if export_format == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
 
 #total sale count
 @routes.route("/sales/total", methods=["GET"])
+@conditional("sales")
+@cache.cached("sales")
 def get_total_sales():
     """Returns the total revenue from all sales."""
     try:
-        total_sales = db.session.query(func.sum(Order.total_price)).scalar() or 0
+        total_sales = db.session.query(func.sum(CategorySalesSummary.revenue)).scalar() or 0
         return jsonify({"total_sales": total_sales}), 200
     except Exception as e:
         return jsonify({"error": f"Failed to fetch total sales: {str(e)}"}), 500
 
 
 
+def decrement_stock(product_id, quantity):
+    """Subtracts `quantity` from a product's stock in a single conditional UPDATE.
+
+    Returns False (and changes nothing) if the product doesn't have enough stock.
+    The caller owns the transaction, so the decrement commits or rolls back with it.
+    """
+    result = db.session.execute(
+        update(Product)
+        .where(Product.id == product_id, Product.stock_quantity >= quantity)
+        .values(stock_quantity=Product.stock_quantity - quantity)
+    )
+    return result.rowcount == 1
+
+
 #api to make call
 @routes.route('/make_sale', methods=['POST'])
 @jwt_required()
 def make_sale():
     """Processes a sale and updates stock."""
     try:
-        verify_jwt_in_request()
         current_user = get_jwt_identity()
         data = request.get_json()
 
@@ -269,7 +735,9 @@ def make_sale():
         if not product:
             return jsonify({"error": "Product not found"}), 404
 
-        if product.stock_quantity < quantity:
+        # Reduce stock atomically; fails instead of overselling under concurrent sales
+        if not decrement_stock(product.id, quantity):
+            db.session.rollback()
             return jsonify({"error": "Not enough stock available"}), 400
 
         # Use transaction to prevent stock deduction if commit fails
@@ -279,13 +747,17 @@ def make_sale():
             product_id=product.id,
             quantity=quantity,
             price_at_sale=product.price,  # Store product price at sale time
-            total_price=total_price
+            total_price=total_price,
+            basket=Basket(user_id=current_user)  # A single-line basket
         )
 
-        product.stock_quantity -= quantity  # Reduce stock
-
         db.session.add(new_order)
-        db.session.commit()  # Commit both order and stock update
+        db.session.flush()  # Assigns the id and timestamp
+        record_sales([new_order])
+        record_product_changes([product.id])  # Stock changed
+        bump_versions("stock", "sales")
+        db.session.commit()  # Commit the order, stock update and summaries together
+        cache.invalidate("stock", "sales")
 
         return jsonify({"message": "Sale successful!", "sale": new_order.to_dict()}), 201  # Consistent API response
 
@@ -296,15 +768,112 @@ def make_sale():
         return jsonify({"error": str(e)}), 500
 
 
+#Bulk checkout (several sale lines in one transaction)
+@routes.route('/checkout', methods=['POST'])
+@jwt_required()
+def checkout():
+    """Processes a basket of sale lines in a single transaction.
+
+    Expects {"items": [{"product_id": 1, "quantity": 2}, ...]}. Either every
+    line is sold or none is.
+    """
+    current_user = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    items = data.get("items")
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    if len(items) > current_app.config["CHECKOUT_MAX_LINES"]:
+        return jsonify({"error": f"A checkout may contain at most {current_app.config['CHECKOUT_MAX_LINES']} lines"}), 400
+
+    # Validate lines and total the quantity requested per product
+    lines = []
+    requested = {}
+    try:
+        for item in items:
+            product_id = int(item.get("product_id") or 0)
+            quantity = int(item.get("quantity", 0))
+            if product_id < 1 or quantity < 1:
+                return jsonify({"error": "Invalid product or quantity", "item": item}), 400
+            lines.append((product_id, quantity))
+            requested[product_id] = requested.get(product_id, 0) + quantity
+    except (AttributeError, TypeError, ValueError):
+        return jsonify({"error": "Each item needs an integer product_id and quantity"}), 400
+
+    try:
+        # Load every product in the basket with one IN query
+        products = {p.id: p for p in Product.query.filter(Product.id.in_(requested)).all()}
+
+        missing = [product_id for product_id in requested if product_id not in products]
+        if missing:
+            return jsonify({"error": "Product not found", "product_ids": missing}), 404
+
+        short = [product_id for product_id, quantity in requested.items()
+                 if products[product_id].stock_quantity < quantity]
+        if short:
+            return jsonify({"error": "Not enough stock available", "product_ids": short}), 409
+
+        # Decrement all products in one executemany; the WHERE clause still guards
+        # against a concurrent sale taking the stock after the check above
+        stock_table = Product.__table__
+        result = db.session.execute(
+            update(stock_table)
+            .where(stock_table.c.id == bindparam("b_id"), stock_table.c.stock_quantity >= bindparam("b_quantity"))
+            .values(stock_quantity=stock_table.c.stock_quantity - bindparam("b_quantity")),
+            [{"b_id": product_id, "b_quantity": quantity} for product_id, quantity in requested.items()]
+        )
+        if result.rowcount != len(requested):
+            # A concurrent sale took the stock after the check above
+            db.session.rollback()
+            stock = dict(db.session.query(Product.id, Product.stock_quantity).filter(Product.id.in_(requested)))
+            short = [product_id for product_id, quantity in requested.items() if stock.get(product_id, 0) < quantity]
+            return jsonify({"error": "Not enough stock available", "product_ids": short}), 409
+
+        basket = Basket(user_id=current_user)
+        db.session.add(basket)
+        db.session.flush()  # Assigns the basket id
+
+        new_orders = db.session.scalars(
+            insert(Order).returning(Order, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": current_user,
+                    "basket_id": basket.id,
+                    "timestamp": basket.timestamp,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "price_at_sale": products[product_id].price,  # Store product price at sale time
+                    "total_price": products[product_id].price * quantity,
+                }
+                for product_id, quantity in lines
+            ]
+        ).all()
+        record_sales(new_orders)
+        record_product_changes(requested)  # Stock changed
+        bump_versions("stock", "sales")
+        db.session.commit()  # One commit for the whole basket
+        cache.invalidate("stock", "sales")
+
+        return jsonify({
+            "message": "Checkout successful!",
+            "basket_id": basket.id,
+            "sales": [order.to_dict() for order in new_orders],
+            "total_price": sum(order.total_price for order in new_orders)
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()  # Rollback if failure occurs
+        return jsonify({"error": str(e)}), 500
+
+
 #Sales Count by Category
 @routes.route("/sales/count-by-category", methods=["GET"])
 def get_sales_count_by_category():
     """Returns the count of sales grouped by category."""
     try:
         sales_counts = (
-            db.session.query(Product.category, func.count(Order.id))
-            .join(Order, Product.id == Order.product_id)
-            .group_by(Product.category)
+            db.session.query(CategorySalesSummary.category, CategorySalesSummary.order_count)
+            .filter(CategorySalesSummary.order_count > 0)
             .all()
         )
 
@@ -313,3 +882,51 @@ def get_sales_count_by_category():
 
     except Exception as e:
         return jsonify({"error": f"Failed to fetch sales counts: {str(e)}"}), 500
+
+
+# Dashboard summary (all dashboard aggregates in one request)
+DASHBOARD_PERIODS = {"24hrs": 1, "weekly": 7, "monthly": 30, "all": None}
+
+
+@routes.route("/dashboard/summary", methods=["GET"])
+def get_dashboard_summary():
+    """Returns every aggregate the dashboard needs, with the sales series bucketed per day.
+
+    Query params:
+        period: "24hrs", "weekly", "monthly" (default) or "all", limits the daily series
+    """
+    period = request.args.get("period", "monthly")
+    if period not in DASHBOARD_PERIODS:
+        return jsonify({"error": f"period must be one of {', '.join(DASHBOARD_PERIODS)}"}), 400
+
+    try:
+        product_counts = (
+            db.session.query(Product.category, func.count(Product.id))
+            .group_by(Product.category)
+            .all()
+        )
+        category_sales = (
+            db.session.query(CategorySalesSummary.category, CategorySalesSummary.order_count, CategorySalesSummary.revenue)
+            .filter(CategorySalesSummary.order_count > 0)
+            .all()
+        )
+
+        daily_query = db.session.query(DailySalesSummary.day, DailySalesSummary.revenue, DailySalesSummary.units_sold)
+        if DASHBOARD_PERIODS[period] is not None:
+            since = datetime.utcnow().date() - timedelta(days=DASHBOARD_PERIODS[period])
+            daily_query = daily_query.filter(DailySalesSummary.day >= since)
+        daily_sales = daily_query.order_by(DailySalesSummary.day).all()
+
+        return jsonify({
+            "total_products": sum(count for _, count in product_counts),
+            "products_by_category": {category: count for category, count in product_counts},
+            "total_sales": sum(revenue for _, _, revenue in category_sales),
+            "sales_by_category": {category: count for category, count, _ in category_sales},
+            "daily_sales": [
+                {"date": day.strftime("%Y-%m-%d"), "total": revenue, "units": units_sold}
+                for day, revenue, units_sold in daily_sales
+            ]
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch dashboard summary: {str(e)}"}), 500
@@ -0,0 +1,152 @@
+# search.py
+# Product catalog search: a SQLite FTS5 index over name/brand (a GIN text index on PostgreSQL).
+import re
+
+from sqlalchemy import bindparam, func, inspect, literal_column, or_, column, select, table, text
+
+from models import db, Product
+
+SEARCH_TABLE = "product_search"  # FTS5 table, rowid = product id
+
+# Tables and indexes owned by the search index rather than the models (skipped by migration autogenerate)
+SEARCH_OBJECTS = re.compile(r"^(product_search(_\w+)?|ix_product_search_document)$")
+
+search_table = table(SEARCH_TABLE, column("rowid"), column("name"), column("brand"))
+
+SEARCH_SORTS = {
+    "name": (Product.name.asc(),),
+    "-name": (Product.name.desc(),),
+    "price": (Product.price.asc(),),
+    "-price": (Product.price.desc(),),
+    "stock": (Product.stock_quantity.asc(),),
+    "-stock": (Product.stock_quantity.desc(),),
+}
+
+_fts_available = {}  # engine url -> whether the FTS5 table exists
+
+
+def include_schema_object(name, type_, parent_names):
+    """Alembic include_name hook that leaves the search index's tables and indexes alone."""
+    return not (type_ in ("table", "index") and name and SEARCH_OBJECTS.match(name))
+
+
+def fts_enabled():
+    """True when running on SQLite and the FTS5 table has been created."""
+    engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return False
+    key = str(engine.url)
+    if key not in _fts_available:
+        _fts_available[key] = inspect(engine).has_table(SEARCH_TABLE)
+    return _fts_available[key]
+
+
+def create_search_index():
+    """Creates the FTS5 table if needed and fills it from the product table (SQLite only)."""
+    if db.engine.dialect.name != "sqlite":
+        return
+    db.session.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "name, brand, prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    db.session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    db.session.execute(text(f"INSERT INTO {SEARCH_TABLE} (rowid, name, brand) SELECT id, name, brand FROM product"))
+    db.session.commit()
+    _fts_available[str(db.engine.url)] = True
+
+
+def index_products(product_ids):
+    """(Re)indexes the given products, in the caller's transaction."""
+    if not product_ids or not fts_enabled():
+        return
+    unindex_products(product_ids)
+    db.session.execute(
+        text(f"INSERT INTO {SEARCH_TABLE} (rowid, name, brand) SELECT id, name, brand FROM product WHERE id IN :ids")
+        .bindparams(bindparam("ids", expanding=True)),
+        {"ids": list(product_ids)}
+    )
+
+
+def unindex_products(product_ids):
+    """Removes the given products from the index, in the caller's transaction."""
+    if not product_ids or not fts_enabled():
+        return
+    db.session.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN :ids")
+        .bindparams(bindparam("ids", expanding=True)),
+        {"ids": list(product_ids)}
+    )
+
+
+def search_terms(q):
+    """Splits a query into words (letters and digits only)."""
+    return re.findall(r"\w+", q or "")
+
+
+def match_filter(query, terms):
+    """Restricts a Product query to rows matching every term as a word prefix.
+
+    Returns (query, relevance order or None).
+    """
+    if fts_enabled():
+        # Materialized, so SQLite runs the MATCH once instead of once per product row it joins
+        expression = " ".join(f'"{term}"*' for term in terms)
+        matches = (
+            select(search_table.c.rowid.label("product_id"), func.bm25(literal_column(SEARCH_TABLE)).label("rank"))
+            .where(literal_column(SEARCH_TABLE).op("MATCH")(expression))
+            .cte("search_matches")
+            .prefix_with("MATERIALIZED")
+        )
+        return query.join(matches, matches.c.product_id == Product.id), matches.c.rank.asc()
+
+    if db.engine.dialect.name == "postgresql":
+        # Same expression as the ix_product_search_document GIN index
+        document = func.to_tsvector("simple", Product.name + " " + Product.brand)
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        return query.filter(document.op("@@")(tsquery)), func.ts_rank(document, tsquery).desc()
+
+    for term in terms:
+        query = query.filter(or_(
+            Product.name.ilike(f"{term}%"), Product.name.ilike(f"% {term}%"),
+            Product.brand.ilike(f"{term}%"), Product.brand.ilike(f"% {term}%")
+        ))
+    return query, None
+
+
+def search_products(q=None, category=None, min_price=None, max_price=None, in_stock=False,
+                    sort=None, limit=25, offset=0):
+    """Returns (products, total) for one page of catalog search results.
+
+    `sort` is "relevance" (the default when searching) or a SEARCH_SORTS key;
+    ties are broken by product id so pages are stable.
+    """
+    query = db.session.query(Product)
+    relevance = None
+    terms = search_terms(q)
+    if terms:
+        query, relevance = match_filter(query, terms)
+    if category:
+        query = query.filter(Product.category == category)
+    if min_price is not None:
+        query = query.filter(Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.price <= max_price)
+    if in_stock:
+        query = query.filter(Product.stock_quantity > 0)
+
+    if sort in (None, "relevance"):
+        order = (relevance,) if relevance is not None else SEARCH_SORTS["name"]
+    else:
+        order = SEARCH_SORTS[sort]
+
+    # The total rides along on each row, so matching and counting happen in one pass
+    rows = (
+        query.add_columns(func.count().over())
+        .order_by(*order, Product.id)
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+    if not rows:
+        return [], query.count() if offset else 0
+    return [product for product, _ in rows], rows[0][1]
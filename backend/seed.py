@@ -1,33 +1,35 @@
 from app import app, db  # Import Flask app instance
 from models import User, bcrypt  # Import User model
 
-with app.app_context():
-    # Admin User
-    admin_email = "admin@example.com"
-    existing_admin = User.query.filter_by(email=admin_email).first()
+# Guarded: password hashing runs in spawned processes, which re-import this module
+if __name__ == "__main__":
+    with app.app_context():
+        # Admin User
+        admin_email = "admin@example.com"
+        existing_admin = User.query.filter_by(email=admin_email).first()
 
-    if not existing_admin:
-        admin = User(
-            username="admin",
-            email=admin_email,
-            role="admin"
-        )
-        admin.set_password("admin123")  # Set password
-        db.session.add(admin)
-        print(" Admin user created successfully!")
+        if not existing_admin:
+            admin = User(
+                username="admin",
+                email=admin_email,
+                role="admin"
+            )
+            admin.set_password("admin123")  # Set password
+            db.session.add(admin)
+            print(" Admin user created successfully!")
 
-    # Staff User
-    staff_email = "staff@example.com"
-    existing_staff = User.query.filter_by(email=staff_email).first()
+        # Staff User
+        staff_email = "staff@example.com"
+        existing_staff = User.query.filter_by(email=staff_email).first()
 
-    if not existing_staff:
-        staff = User(
-            username="staff",
-            email=staff_email,
-            role="staff"
-        )
-        staff.set_password("staff123")  # Set password
-        db.session.add(staff)
-        print(" Staff user created successfully!")
+        if not existing_staff:
+            staff = User(
+                username="staff",
+                email=staff_email,
+                role="staff"
+            )
+            staff.set_password("staff123")  # Set password
+            db.session.add(staff)
+            print(" Staff user created successfully!")
 
-    db.session.commit()
+        db.session.commit()
@@ -0,0 +1,81 @@
+# serve.py
+# Production entry point: `python serve.py` runs the API under the server named by SERVER (see config.py).
+import importlib.util
+import os
+import signal
+import sys
+
+from config import Config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def require(module, package):
+    if importlib.util.find_spec(module) is None:
+        raise RuntimeError(f"SERVER='{Config.SERVER}' requires the {package} package")
+
+
+def bind_address(bind):
+    """Splits SERVER_BIND ("host:port") for servers that take them separately."""
+    host, _, port = bind.rpartition(":")
+    return host or "0.0.0.0", int(port)
+
+
+def run_gunicorn():
+    """Replaces this process with a gunicorn master that forks SERVER_WORKERS workers (Unix only)."""
+    require("gunicorn", "gunicorn")
+    config_file = os.path.join(BASE_DIR, "gunicorn.conf.py")
+    os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "--config", config_file, "--chdir", BASE_DIR])
+
+
+def run_waitress():
+    """Serves from this one process with SERVER_THREADS threads (also runs on Windows)."""
+    require("waitress", "waitress")
+    from waitress import create_server
+    from app import app, shutdown
+
+    server = create_server(
+        app,
+        listen=Config.SERVER_BIND,
+        threads=Config.SERVER_THREADS,
+        channel_timeout=max(Config.SERVER_KEEPALIVE, 1),  # Idle connections are closed after this
+    )
+    # Treat SIGTERM like Ctrl+C: waitress stops accepting and waits briefly for running requests
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.run()
+    finally:
+        shutdown(app)
+
+
+def run_asgi():
+    """Serves asgi.py from SERVER_WORKERS uvicorn processes."""
+    require("uvicorn", "uvicorn")
+    require("a2wsgi", "a2wsgi")
+    import uvicorn
+
+    host, port = bind_address(Config.SERVER_BIND)
+    uvicorn.run(
+        "asgi:application",
+        app_dir=BASE_DIR,
+        host=host,
+        port=port,
+        workers=Config.SERVER_WORKERS,
+        lifespan="on",
+        timeout_keep_alive=Config.SERVER_KEEPALIVE,
+        timeout_graceful_shutdown=Config.SERVER_GRACEFUL_TIMEOUT,
+    )
+
+
+SERVERS = {
+    "gunicorn": run_gunicorn,
+    "waitress": run_waitress,
+    "asgi": run_asgi,
+}
+
+
+# Guarded: the password hashing pool's spawned processes import this module too
+if __name__ == "__main__":
+    if Config.SERVER not in SERVERS:
+        raise ValueError(f"Unknown SERVER: {Config.SERVER}")
+    SERVERS[Config.SERVER]()
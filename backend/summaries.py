@@ -0,0 +1,145 @@
+# summaries.py
+# Incrementally maintained sales aggregates, so dashboard reads don't scan the order table.
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, insert, select, cast, Date, Integer
+
+from models import (
+    db, Product, Order, ProductSalesSummary, CategorySalesSummary, DailySalesSummary,
+    ProductDailySales, ProductMonthlySales
+)
+from ai.cooccurrence import record_baskets, rebuild_pairs
+from upserts import increment_rows
+
+
+def increment_summary(model, key, **counters):
+    """Adds to the counters of one summary row, creating the row if needed."""
+    increment_rows(model.__table__, list(key), [{**key, **counters}])
+
+
+def add_counters(totals, key, **counters):
+    current = totals.setdefault(key, {})
+    for column, value in counters.items():
+        current[column] = current.get(column, 0) + value
+
+
+def record_sales(orders):
+    """Adds freshly flushed orders to the summary tables and basket pair counts.
+
+    Must run in the same transaction as the order inserts, so the summaries
+    commit or roll back together with the sale.
+    """
+    totals = {}
+    baskets = {}  # basket_id -> product ids in that basket
+    for order in orders:
+        sale = {"units_sold": order.quantity, "revenue": order.total_price, "order_count": 1}
+        product_key = (ProductSalesSummary, (("product_id", order.product_id),))
+        day_key = (DailySalesSummary, (("day", order.timestamp.date()),)) if order.timestamp else None
+
+        add_counters(totals, product_key, **sale)
+        add_counters(totals, (CategorySalesSummary, (("category", order.product.category),)), **sale)
+        if day_key:
+            add_counters(totals, day_key, **sale)
+
+            # Per-product rollups
+            day = order.timestamp.date()
+            rollup = {"units_sold": order.quantity, "revenue": order.total_price}
+            add_counters(totals, (ProductDailySales, (("product_id", order.product_id), ("day", day))), **rollup)
+            add_counters(totals, (ProductMonthlySales, (
+                ("product_id", order.product_id), ("month", day.replace(day=1)), ("calendar_month", day.month)
+            )), **rollup)
+
+        # Basket counts: each basket counts once per day and once per product it contains
+        basket = baskets.get(order.basket_id)
+        if basket is None:
+            basket = baskets[order.basket_id] = set()
+            if day_key:
+                add_counters(totals, day_key, basket_count=1)
+        if order.product_id not in basket:
+            basket.add(order.product_id)
+            add_counters(totals, product_key, basket_count=1)
+
+    for (model, key), counters in totals.items():
+        increment_summary(model, dict(key), **counters)
+
+    record_baskets(basket for basket_id, basket in baskets.items() if basket_id is not None)
+
+
+def move_product_category(product_id, old_category, new_category):
+    """Moves a product's sales from one category total to another after a category change."""
+    product_totals = db.session.get(ProductSalesSummary, product_id)
+    if not product_totals or old_category == new_category:
+        return
+
+    increment_summary(
+        CategorySalesSummary, {"category": old_category},
+        units_sold=-product_totals.units_sold, revenue=-product_totals.revenue, order_count=-product_totals.order_count
+    )
+    increment_summary(
+        CategorySalesSummary, {"category": new_category},
+        units_sold=product_totals.units_sold, revenue=product_totals.revenue, order_count=product_totals.order_count
+    )
+
+
+def month_start(column):
+    """SQL expression for the first day of the month of a timestamp."""
+    if db.engine.dialect.name == "sqlite":
+        return func.date(column, "start of month")
+    return cast(func.date_trunc("month", column), Date)
+
+
+def daily_rollup_cutoff():
+    """Oldest day kept in ProductDailySales."""
+    return (datetime.utcnow() - timedelta(days=current_app.config["ROLLUP_DAILY_RETENTION_DAYS"])).date()
+
+
+def prune_daily_rollups():
+    """Drops per-product daily rows older than ROLLUP_DAILY_RETENTION_DAYS (monthly rows are kept)."""
+    deleted = db.session.query(ProductDailySales).filter(ProductDailySales.day < daily_rollup_cutoff()).delete()
+    db.session.commit()
+    return deleted
+
+
+def rebuild_sales_summaries():
+    """Recomputes every summary table and the basket pair counts from the full order history."""
+    for model in (ProductSalesSummary, CategorySalesSummary, DailySalesSummary, ProductDailySales, ProductMonthlySales):
+        db.session.query(model).delete()
+
+    sale_totals = (func.sum(Order.quantity), func.sum(Order.total_price), func.count(Order.id))
+    db.session.execute(insert(ProductSalesSummary).from_select(
+        ["product_id", "units_sold", "revenue", "order_count", "basket_count"],
+        select(Order.product_id, *sale_totals, func.count(func.distinct(Order.basket_id)))
+        .group_by(Order.product_id)
+    ))
+    db.session.execute(insert(CategorySalesSummary).from_select(
+        ["category", "units_sold", "revenue", "order_count"],
+        select(Product.category, *sale_totals)
+        .join(Order, Order.product_id == Product.id)
+        .group_by(Product.category)
+    ))
+    day = func.date(Order.timestamp)
+    db.session.execute(insert(DailySalesSummary).from_select(
+        ["day", "units_sold", "revenue", "order_count", "basket_count"],
+        select(day, *sale_totals, func.count(func.distinct(Order.basket_id)))
+        .where(Order.timestamp.isnot(None))
+        .group_by(day)
+    ))
+    db.session.execute(insert(ProductDailySales).from_select(
+        ["product_id", "day", "units_sold", "revenue"],
+        select(Order.product_id, day, func.sum(Order.quantity), func.sum(Order.total_price))
+        .where(Order.timestamp >= daily_rollup_cutoff())
+        .group_by(Order.product_id, day)
+    ))
+    month = month_start(Order.timestamp)
+    db.session.execute(insert(ProductMonthlySales).from_select(
+        ["product_id", "month", "calendar_month", "units_sold", "revenue"],
+        select(
+            Order.product_id, month, cast(func.extract("month", Order.timestamp), Integer),
+            func.sum(Order.quantity), func.sum(Order.total_price)
+        )
+        .where(Order.timestamp.isnot(None))
+        .group_by(Order.product_id, month, func.extract("month", Order.timestamp))
+    ))
+    rebuild_pairs()
+    db.session.commit()
@@ -0,0 +1,53 @@
+# upserts.py
+# Counter rows that concurrent writers may both try to create: increment the row if it exists, else insert it.
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+
+
+def increment_rows(table, keys, rows, values=None):
+    """Adds each row's counters to the matching row of `table`, inserting the rows that don't exist yet.
+
+    `keys` names the key columns; every other column of a row is a counter
+    (all rows must have the same columns, with distinct keys). `values` are
+    set on updated and inserted rows alike. Runs in the caller's transaction.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    values = values or {}
+    counters = [column for column in rows[0] if column not in keys]
+    increment = (
+        update(table)
+        .where(*[table.c[column] == bindparam(f"b_{column}") for column in keys])
+        .values(**{column: table.c[column] + bindparam(f"b_{column}") for column in counters}, **values)
+    )
+
+    def params(row):
+        return {f"b_{column}": value for column, value in row.items()}
+
+    if len(rows) == 1:
+        missing = [] if db.session.execute(increment, params(rows[0])).rowcount else rows
+    else:
+        existing = {
+            tuple(key) for key in db.session.execute(
+                select(*[table.c[column] for column in keys])
+                .where(*[table.c[column].in_({row[column] for row in rows}) for column in keys])
+            )
+        }
+        known = [row for row in rows if tuple(row[column] for column in keys) in existing]
+        missing = [row for row in rows if tuple(row[column] for column in keys) not in existing]
+        if known:
+            db.session.execute(increment, [params(row) for row in known])
+    if not missing:
+        return
+
+    try:
+        # Savepoint, so losing an insert race to another worker doesn't abort the caller's write
+        with db.session.begin_nested():
+            db.session.execute(insert(table), [{**row, **values} for row in missing])
+    except IntegrityError:
+        for row in missing:
+            if not db.session.execute(increment, params(row)).rowcount:
+                db.session.execute(insert(table).values(**row, **values))
@@ -0,0 +1,101 @@
+# versions.py
+# Catalog version counters behind the ETag / Last-Modified headers of read endpoints.
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import Response, g, make_response, request
+from sqlalchemy import bindparam, insert, update
+from werkzeug.http import is_resource_modified
+
+from cache import request_key
+from models import db, CatalogVersion, ProductChange
+from upserts import increment_rows
+
+
+def bump_versions(*names):
+    """Increments the named version counters, in the caller's transaction.
+
+    Call before committing a write, so the new version becomes visible
+    together with the data it describes.
+    """
+    increment_rows(
+        CatalogVersion.__table__, ["name"], [{"name": name, "version": 1} for name in set(names)],
+        values={"updated_at": datetime.utcnow()}
+    )
+
+
+def record_product_changes(product_ids, operation="upsert"):
+    """Stamps products with a new "changes" version, in the caller's transaction.
+
+    Bumping the counter locks its row until commit, so versions become
+    visible in increasing order and a sync cursor never skips a change.
+    Call after the write's other statements, just before committing.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    bump_versions("changes")
+    version = db.session.query(CatalogVersion.version).filter(CatalogVersion.name == "changes").scalar()
+    now = datetime.utcnow()
+
+    table = ProductChange.__table__
+    existing = {
+        product_id for (product_id,) in
+        db.session.query(ProductChange.product_id).filter(ProductChange.product_id.in_(product_ids))
+    }
+    if existing:
+        db.session.execute(
+            update(table).where(table.c.product_id == bindparam("b_product_id"))
+            .values(version=version, operation=operation, changed_at=now),
+            [{"b_product_id": product_id} for product_id in existing]
+        )
+    if product_ids - existing:
+        # No insert race: other writers wait on the "changes" row locked above
+        db.session.execute(insert(table), [
+            {"product_id": product_id, "version": version, "operation": operation, "changed_at": now}
+            for product_id in product_ids - existing
+        ])
+
+
+def current_versions(names):
+    """Returns {name: (version, updated_at)}; missing counters read as (0, None)."""
+    rows = (
+        db.session.query(CatalogVersion.name, CatalogVersion.version, CatalogVersion.updated_at)
+        .filter(CatalogVersion.name.in_(names))
+        .all()
+    )
+    versions = {name: (0, None) for name in names}
+    versions.update({name: (version, updated_at) for name, version, updated_at in rows})
+    return versions
+
+
+def conditional(*names):
+    """Decorator adding ETag / Last-Modified to a GET view whose output only depends on `names`.
+
+    When the client's copy is current, 304 is returned without calling the view.
+    Place it above cache.cached, which then keys cached bodies on the same versions.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = current_versions(names)
+            g.catalog_versions = versions
+            tag = ",".join(f"{name}={versions[name][0]}" for name in names)
+            etag = hashlib.sha256(f"{tag}:{request_key()}".encode("utf-8")).hexdigest()[:32]
+            last_modified = max((updated_at for _, updated_at in versions.values() if updated_at), default=None)
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True  # Clients may keep a copy but must revalidate it
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,3 @@
+# wsgi.py
+# WSGI entry point for production servers: `gunicorn wsgi:application` (settings in gunicorn.conf.py).
+from app import app as application
@@ -78,7 +78,7 @@ const AIInsights = () => {
           <InsightCard title="🤝 Frequently Bought Together">
             {recommendations.frequently_bought_together.length > 0 ? (
               recommendations.frequently_bought_together.map((item, idx) => (
-                <InsightItem key={idx} name={item} />
+                <InsightItem key={idx} name={item.names.join(" + ")} badge={`${item.count} baskets`} />
               ))
             ) : (
               <div className="text-gray-500 text-center py-4">No data available. Coming soon!</div>
@@ -3,7 +3,6 @@ import { useNavigate } from "react-router-dom";
 import { FiHome, FiShoppingCart, FiBox, FiSettings, FiLogOut, FiMenu, FiPackage } from "react-icons/fi";
 import { motion } from "framer-motion";
 import axios from "axios";
-import dayjs from "dayjs"; //  Import for date filtering
 
 import { Card, CardContent } from "@/components/ui/card";
 import SalesChart from "../components/charts/SalesChart";
@@ -36,108 +35,23 @@ export default function Dashboard() {
     return () => window.removeEventListener("resize", handleResize);
   }, []);
 
-  // Fetch Dashboard Data
+  //  Fetch all dashboard aggregates in one request, refetching when the interval changes
   useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const [totalRes, categoryRes, salesRes] = await Promise.all([
-          axios.get("http://localhost:5000/products/count-total"),
-          axios.get("http://localhost:5000/products/count-by-category"),
-          axios.get("http://localhost:5000/sales/total")
-        ]);
-
-        setTotalCount(totalRes.data.total_count);
-        setCategoryCounts(categoryRes.data);
-        setTotalSales(salesRes.data.total_sales);
-      } catch (error) {
-        console.error(" Error fetching dashboard data:", error);
-      }
-    };
-
-    fetchData();
-  }, []);
-
-  useEffect(() => {
-    axios.get("http://localhost:5000/sales")
+    axios.get("http://localhost:5000/dashboard/summary", { params: { period: filter } })
       .then(response => {
-        console.log("Sales API Response:", response.data); // Debugging log
-        const formattedSales = response.data.sales.map(sale => ({
-          date: sale.date.split(" ")[0],  //  Keep only "YYYY-MM-DD" for chart
-          total: sale.total_price,  //  Keep total price for graph
-          fullDate: sale.date //  Store full date for table (optional)
-        }));
-        setSalesData(formattedSales);
-      })
-      .catch(error => console.error(" Error fetching sales data:", error));
-  }, []);
-
-  //  Fetch Sales Data & Filter Based on Selected Interval
-  useEffect(() => {
-    axios.get("http://localhost:5000/sales")
-      .then(response => {
-        const allSales = response.data.sales.map(sale => ({
-          date: sale.date.split(" ")[0],  //  Keep only "YYYY-MM-DD"
-          fullDate: sale.date, //  Full timestamp (for reference)
-          total: sale.total_price
-        }));
-
-        //  Filter Sales Based on Selected Interval
-        const filteredSales = allSales.filter(sale => {
-          const saleDate = dayjs(sale.date);
-          const now = dayjs();
-
-          if (filter === "24hrs") return saleDate.isAfter(now.subtract(1, "day"));
-          if (filter === "weekly") return saleDate.isAfter(now.subtract(7, "days"));
-          if (filter === "monthly") return saleDate.isAfter(now.subtract(1, "month"));
-          return true; // Default: Show all sales
-        });
-
-        setSalesData(filteredSales);
-      })
-      .catch(error => console.error("❌ Error fetching sales data:", error));
-  }, [filter]); //  Refetch when filter changes
-  
+        const summary = response.data;
 
-  useEffect(() => {
-    //  Fetch Total Products & Products by Category
-    axios.get("http://localhost:5000/products/count-total")
-      .then(response => setTotalCount(response.data.total_count))
-      .catch(error => console.error("Error fetching total product count:", error));
-  
-    /*axios.get("http://localhost:5000/products/count-by-category")
-      .then(response => setCategoryCounts(response.data)) //  Store product counts separately
-      .catch(error => console.error("Error fetching category counts:", error));*/
-
-    axios.get("http://localhost:5000/sales/count-by-category")
-      .then(response => {
-        console.log("📊 Sales Category API Response:", response.data); //  Debugging log
-        const formattedData = Object.entries(response.data).map(([category, count]) => ({
+        setTotalCount(summary.total_products);
+        setCategoryCounts(summary.products_by_category);
+        setTotalSales(summary.total_sales);
+        setSalesData(summary.daily_sales);  //  Already bucketed per day as { date, total }
+        setCategoryData(Object.entries(summary.sales_by_category).map(([category, count]) => ({
           name: category,
           value: count
-        }));
-        setCategoryData(formattedData);
+        })));
       })
-      .catch(error => console.error("❌ Error fetching sales category data:", error));
-  
-    //  Fetch Total Sales
-    axios.get("http://localhost:5000/sales/total")
-      .then(response => setTotalSales(response.data.total_sales))
-      .catch(error => console.error("Error fetching total sales:", error));
-  
-    //  Fetch Sales Per Category for Pie Chart
-    axios.get("http://localhost:5000/sales/count-by-category")
-      .then(response => {
-        const formattedData = Object.entries(response.data).map(([category, count]) => ({
-          name: category,
-          value: count
-        }));
-        setCategoryData(formattedData); //  Use this for Sales Pie Chart
-      })
-      .catch(error => console.error("Error fetching sales category data:", error));
-  }, []);
-  
-  
-  
+      .catch(error => console.error("❌ Error fetching dashboard summary:", error));
+  }, [filter]); //  Refetch when filter changes
 
   return (
     <div className="flex min-h-screen bg-gray-100">
@@ -11,7 +11,7 @@ export default function Sales() {
 
   // State for Sales Data
   const [sales, setSales] = useState([]);
-  const [filteredSales, setFilteredSales] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);  // Cursor of the next (older) page, null when done
 
   // State for Adding Sales
   const [products, setProducts] = useState([]);
@@ -27,31 +27,31 @@ export default function Sales() {
   const [filterCategory, setFilterCategory] = useState("");
 
   useEffect(() => {
-    fetchSales();
     fetchProducts();
   }, []);
 
-  //  Fetch Sales Data from API
-  const fetchSales = async () => {
+  //  Fetch Sales Data from API (filtered on the server, one page at a time)
+  const fetchSales = async (after = null) => {
     try {
-      const response = await axios.get("http://127.0.0.1:5000/sales");
+      const params = { date: filterDate, q: filterBrand, category: filterCategory, after };
+      const response = await axios.get("http://127.0.0.1:5000/sales", { params });
       console.log("📊 Sales API Response:", response.data);  //  Debugging Log
-      
+
       if (Array.isArray(response.data.sales)) {
-        setSales(response.data.sales);
-        setFilteredSales(response.data.sales);
+        setSales(prevSales => after ? [...prevSales, ...response.data.sales] : response.data.sales);
+        setNextCursor(response.data.next_cursor);
       } else {
         console.warn("⚠️ Unexpected sales data format:", response.data);
         setSales([]);
-        setFilteredSales([]);
+        setNextCursor(null);
       }
     } catch (error) {
       console.error("❌ Error fetching sales:", error);
       setSales([]);
-      setFilteredSales([]);
+      setNextCursor(null);
     }
   };
-  
+
 
   //  Fetch Products for Sale Selection
   const fetchProducts = async () => {
@@ -64,46 +64,10 @@ export default function Sales() {
     }
   };
 
-  //  Apply Filters (Date, Brand, Category)
+  //  Apply Filters (Date, Brand, Category): reload from the first page
   useEffect(() => {
-  
-    let filtered = sales;
-  
-    if (filterDate) {
-      console.log("Filter Date:", filterDate);  // Log the raw filterDate
-  
-      // Ensure filterDate is in YYYY-MM-DD format (it already is, but we'll keep it for clarity)
-      const formattedFilterDate = filterDate;
-      console.log("Formatted Date:", formattedFilterDate);  // Log the formatted date
-  
-      // Filter sales based on the formatted date (no need to split or pad)
-      filtered = filtered.filter(sale => {
-        // Extract the date part (YYYY-MM-DD) from the sale.date
-        const saleDate = sale?.date?.split(' ')[0];  // Get the date part (YYYY-MM-DD) before the space
-        console.log("Sale Date:", saleDate);  // Log the extracted sale date
-        
-        // Compare the saleDate (YYYY-MM-DD) with formattedFilterDate
-        return saleDate === formattedFilterDate;  // Compare in the same format
-      });
-    }
-  
-    // Apply additional filters for brand and category
-    if (filterBrand) {
-      filtered = filtered.filter(sale => 
-        sale?.product?.toLowerCase().includes(filterBrand.toLowerCase()) || 
-        sale?.brand?.toLowerCase().includes(filterBrand.toLowerCase())
-      );
-    }
-  
-    if (filterCategory) {
-      filtered = filtered.filter(sale => sale?.category?.toLowerCase() === filterCategory?.toLowerCase());
-    }
-  
-    console.log("Filtered Sales:", filtered);  // Debugging log for filtered sales
-    setFilteredSales(filtered);
-  }, [filterDate, filterBrand, filterCategory, sales]);
-  
-     
+    fetchSales();
+  }, [filterDate, filterBrand, filterCategory]);
 
   //  Make a Sale (Reduce Stock Automatically)
   const handleMakeSale = async () => {
@@ -125,7 +89,6 @@ export default function Sales() {
         const newSale = response.data.sale;
   
         setSales(prevSales => [newSale, ...prevSales]);  // Add new sale to state
-        setFilteredSales(prevSales => [newSale, ...prevSales]);  //  Update filtered list
   
         fetchProducts();  // Update stock levels
         setIsModalOpen(false);
@@ -139,9 +102,9 @@ export default function Sales() {
   };
   
 
-  //  Calculate Total Revenue
-  const totalRevenue = (filteredSales?.length > 0) 
-  ? filteredSales.reduce((sum, sale) => sum + ((sale?.quantity || 0) * (sale?.price || 0)), 0)
+  //  Calculate Total Revenue (of the sales loaded so far)
+  const totalRevenue = (sales?.length > 0) 
+  ? sales.reduce((sum, sale) => sum + ((sale?.quantity || 0) * (sale?.price || 0)), 0)
   : 0;
 
 
@@ -204,8 +167,8 @@ export default function Sales() {
             </tr>
           </thead>
           <tbody>
-            {Array.isArray(filteredSales) && filteredSales.length > 0 ? (
-              filteredSales.map((sale, index) => (
+            {Array.isArray(sales) && sales.length > 0 ? (
+              sales.map((sale, index) => (
                 sale && sale.id ? (  //  Ensure sale is defined before using sale.id
                   <tr key={sale.id || index} className="text-gray-900 text-left border hover:bg-gray-100">
                     <td className="border p-3">{sale.date || "Unknown"}</td>  
@@ -224,6 +187,15 @@ export default function Sales() {
           </tbody>
         </table>
 
+        {/* 📌 Older Sales */}
+        {nextCursor && (
+          <div className="flex justify-center mt-4">
+            <button onClick={() => fetchSales(nextCursor)} className="bg-blue-600 text-white px-4 py-2 rounded hover:bg-blue-700 transition">
+              Load More
+            </button>
+          </div>
+        )}
+
         {/* 📌 Make Sale Modal */}
         {isModalOpen && (
         <div className="fixed inset-0 bg-black bg-opacity-50 flex justify-center items-center">